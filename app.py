@@ -17,37 +17,47 @@ Render, a ``Procfile`` is included so that Gunicorn can serve the app.
 from __future__ import annotations
 
 import os
-from flask import Flask, jsonify, request
+
+import orjson
+from flask import Flask, Response, jsonify, request
+from flask_orjson import OrjsonProvider
 
 from scraper import search_products
 
 
+# Static payloads, built once at import
+_INDEX_HTML = (
+    "<h1>Daraz Scraper API</h1>"
+    "<p>Use <code>/api/search?query=&lt;keywords&gt;</code> to search for products "
+    "and retrieve seller details for the top results.</p>"
+).encode("utf-8")
+
+_TEST_BODY = orjson.dumps({
+    "status": "success",
+    "message": "Daraz Scraper API is working!",
+    "endpoints": {
+        "test": "/test",
+        "search": "/api/search?query=<keywords>&limit=<number>",
+        "home": "/"
+    },
+    "example_usage": "/api/search?query=toothpaste&limit=5"
+})
+
+
 def create_app() -> Flask:
     """Factory to create and configure the Flask application instance."""
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
 
     @app.route("/")
     def index():
         """Return a simple HTML landing page describing the API."""
-        return (
-            "<h1>Daraz Scraper API</h1>"
-            "<p>Use <code>/api/search?query=&lt;keywords&gt;</code> to search for products "
-            "and retrieve seller details for the top results.</p>"
-        )
+        return Response(_INDEX_HTML, mimetype="text/html; charset=utf-8")
 
     @app.route("/test")
     def test_endpoint():
         """Simple test endpoint to verify the API is working."""
-        return jsonify({
-            "status": "success",
-            "message": "Daraz Scraper API is working!",
-            "endpoints": {
-                "test": "/test",
-                "search": "/api/search?query=<keywords>&limit=<number>",
-                "home": "/"
-            },
-            "example_usage": "/api/search?query=toothpaste&limit=5"
-        }), 200
+        return Response(_TEST_BODY, mimetype="application/json")
 
     @app.route("/api/search")
     def api_search():
@@ -64,10 +74,15 @@ def create_app() -> Flask:
                 "seller_name" and "seller_location" fields may be null.
             400 Bad Request: When no ``query`` parameter is provided.
         """
-        query = request.args.get("query", type=str)
-        limit = request.args.get("limit", default=10, type=int)
+        args = request.args
+        query = args.get("query")
+        limit_s = args.get("limit")
         if not query:
             return jsonify({"error": "Missing required parameter: query"}), 400
+        try:
+            limit = int(limit_s) if limit_s is not None else 10
+        except ValueError:
+            return jsonify({"error": "Parameter limit must be an integer"}), 400
         try:
             results = search_products(query, max_results=limit)
         except Exception as exc:
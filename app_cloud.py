@@ -9,95 +9,134 @@ Designed for deployment on platforms like Render, Heroku, etc.
 import os
 import time
 import logging
-import threading
-from flask import Flask, jsonify, request
+import orjson
+from flask import Flask, Response, jsonify, request
+from flask_orjson import OrjsonProvider
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from app_common import register_access_log, register_error_handlers, timestamp
 from scraper_cloud import search_products_cloud
 
-# Simple rate limiting
-request_lock = threading.Lock()
-last_request_time = [0]  # Use list to make it mutable
+try:
+    import psutil
+    _PROC = psutil.Process()
+    _PROC.cpu_percent(interval=None)  # Prime so later calls return a real delta
+except ImportError:
+    _PROC = None
+
+# Last /health payload, reused for _HEALTH_TTL seconds
+_HEALTH_TTL = 5
+_HEALTH_CACHE = {'t': 0.0, 'data': None}
+
+# Static payloads, built once at import
+_INDEX_HTML = (
+    "<h1>Daraz Scraper API - Cloud</h1>"
+    "<p>High-performance API for scraping Daraz products.</p>"
+    "<h2>Endpoints:</h2>"
+    "<ul>"
+    "<li><code>/test</code> - Test endpoint</li>"
+    "<li><code>/api/search?query=&lt;keywords&gt;&limit=&lt;number&gt;</code> - Search products</li>"
+    "<li><code>/health</code> - Health check</li>"
+    "</ul>"
+    "<h2>Features:</h2>"
+    "<ul>"
+    "<li>✅ Cloud optimized</li>"
+    "<li>✅ Memory efficient</li>"
+    "<li>✅ Error handling</li>"
+    "<li>✅ Logging</li>"
+    "<li>✅ Health monitoring</li>"
+    "</ul>"
+).encode("utf-8")
+
+_TEST_BODY = orjson.dumps({
+    "status": "success",
+    "message": "Daraz Scraper API (Cloud) is working!",
+    "environment": os.environ.get('FLASK_ENV', 'production'),
+    "endpoints": {
+        "test": "/test",
+        "search": "/api/search?query=<keywords>&limit=<number>",
+        "health": "/health",
+        "home": "/"
+    },
+    "example_usage": "/api/search?query=toothpaste&limit=5"
+})
 
 def create_app() -> Flask:
     """Factory to create and configure the Flask application instance."""
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     
     # Cloud configuration
     app.config['DEBUG'] = False
     app.config['TESTING'] = False
     
+    # Per-client rate limiting; point REDIS_URL at Redis to share counters across workers
+    limiter = Limiter(
+        get_remote_address,
+        app=app,
+        storage_uri=os.environ.get('REDIS_URL', 'memory://'),
+    )
+    
     # Configure logging for cloud
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     logger = logging.getLogger(__name__)
+    
+    # Access lines are pre-formatted JSON; skip the root handler and format string
+    access_logger = logging.getLogger(f"{__name__}.access")
+    if not access_logger.handlers:
+        access_handler = logging.StreamHandler()
+        access_handler.setFormatter(logging.Formatter('%(message)s'))
+        access_logger.addHandler(access_handler)
+    access_logger.propagate = False
 
     @app.route("/")
     def index():
         """Return a simple HTML landing page describing the API."""
-        return (
-            "<h1>Daraz Scraper API - Cloud</h1>"
-            "<p>High-performance API for scraping Daraz products.</p>"
-            "<h2>Endpoints:</h2>"
-            "<ul>"
-            "<li><code>/test</code> - Test endpoint</li>"
-            "<li><code>/api/search?query=&lt;keywords&gt;&limit=&lt;number&gt;</code> - Search products</li>"
-            "<li><code>/health</code> - Health check</li>"
-            "</ul>"
-            "<h2>Features:</h2>"
-            "<ul>"
-            "<li>✅ Cloud optimized</li>"
-            "<li>✅ Memory efficient</li>"
-            "<li>✅ Error handling</li>"
-            "<li>✅ Logging</li>"
-            "<li>✅ Health monitoring</li>"
-            "</ul>"
-        )
+        return Response(_INDEX_HTML, mimetype="text/html; charset=utf-8")
 
     @app.route("/test")
     def test_endpoint():
         """Simple test endpoint to verify the API is working."""
-        return jsonify({
-            "status": "success",
-            "message": "Daraz Scraper API (Cloud) is working!",
-            "environment": os.environ.get('FLASK_ENV', 'production'),
-            "endpoints": {
-                "test": "/test",
-                "search": "/api/search?query=<keywords>&limit=<number>",
-                "health": "/health",
-                "home": "/"
-            },
-            "example_usage": "/api/search?query=toothpaste&limit=5"
-        }), 200
+        return Response(_TEST_BODY, mimetype="application/json")
 
     @app.route("/health")
     def health_check():
         """Health check endpoint for monitoring."""
-        try:
-            import psutil
-            process = psutil.Process()
-            memory_info = process.memory_info()
-            
-            return jsonify({
+        now = time.monotonic()
+        if now - _HEALTH_CACHE['t'] < _HEALTH_TTL:
+            return jsonify(_HEALTH_CACHE['data']), 200
+        
+        if _PROC is not None:
+            info = _PROC.as_dict(attrs=['memory_info', 'memory_percent', 'cpu_percent'])
+            memory_info = info['memory_info']
+            data = {
                 "status": "healthy",
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp": timestamp(),
                 "environment": os.environ.get('FLASK_ENV', 'production'),
                 "memory_usage": {
                     "rss_mb": round(memory_info.rss / 1024 / 1024, 2),
                     "vms_mb": round(memory_info.vms / 1024 / 1024, 2),
-                    "percent": round(process.memory_percent(), 2)
+                    "percent": round(info['memory_percent'], 2)
                 },
-                "cpu_percent": round(process.cpu_percent(), 2)
-            }), 200
-        except ImportError:
-            return jsonify({
+                "cpu_percent": round(info['cpu_percent'], 2)
+            }
+        else:
+            data = {
                 "status": "healthy",
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp": timestamp(),
                 "environment": os.environ.get('FLASK_ENV', 'production'),
                 "note": "psutil not available for detailed metrics"
-            }), 200
+            }
+        
+        _HEALTH_CACHE['t'] = now
+        _HEALTH_CACHE['data'] = data
+        return jsonify(data), 200
 
     @app.route("/api/search")
+    @limiter.limit("20 per minute")
     def api_search():
         """JSON API endpoint that returns seller details for a search term.
 
@@ -110,38 +149,32 @@ def create_app() -> Flask:
                 "product_name", "price", "seller_name", "seller_location",
                 "product_url", "rank" keys.
             400 Bad Request: When no ``query`` parameter is provided.
+            429 Too Many Requests: When the client exceeds the rate limit.
             500 Internal Server Error: When scraping fails.
         """
         start_time = time.time()
         
         # Get query parameters
-        query = request.args.get("query", type=str)
-        limit = request.args.get("limit", default=10, type=int)
+        args = request.args
+        query = args.get("query")
+        limit_s = args.get("limit")
         
         # Validate parameters
         if not query:
             logger.warning("Missing query parameter")
             return jsonify({"error": "Missing required parameter: query"}), 400
         
-        if limit > 50:  # Reduced limit for cloud deployment
-            logger.warning(f"Limit too high: {limit}")
-            return jsonify({"error": "Limit cannot exceed 50"}), 400
+        try:
+            limit = int(limit_s) if limit_s is not None else 10
+        except ValueError:
+            logger.warning(f"Invalid limit: {limit_s}")
+            return jsonify({"error": "Parameter limit must be an integer"}), 400
         
-        if limit < 1:
-            logger.warning(f"Limit too low: {limit}")
-            return jsonify({"error": "Limit must be at least 1"}), 400
+        if not 1 <= limit <= 50:  # Reduced limit for cloud deployment
+            logger.warning(f"Limit out of range: {limit}")
+            return jsonify({"error": "Limit must be between 1 and 50"}), 400
         
         try:
-            # Simple rate limiting - prevent concurrent requests
-            with request_lock:
-                current_time = time.time()
-                time_since_last = current_time - last_request_time[0]
-                if time_since_last < 3:  # Minimum 3 seconds between requests for cloud
-                    wait_time = 3 - time_since_last
-                    logger.info(f"Rate limiting: waiting {wait_time:.1f}s")
-                    time.sleep(wait_time)
-                last_request_time[0] = time.time()
-            
             logger.info(f"Searching for '{query}' with limit {limit}")
             
             # Perform the search
@@ -156,7 +189,7 @@ def create_app() -> Flask:
                 "results": results,
                 "count": len(results),
                 "processing_time": round(processing_time, 2),
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+                "timestamp": timestamp()
             }), 200
             
         except Exception as exc:
@@ -171,37 +204,10 @@ def create_app() -> Flask:
             }), 500
 
     # Error handlers
-    @app.errorhandler(404)
-    def not_found_handler(e):
-        return jsonify({
-            "error": "Not found",
-            "message": "The requested endpoint was not found"
-        }), 404
-
-    @app.errorhandler(405)
-    def method_not_allowed_handler(e):
-        return jsonify({
-            "error": "Method not allowed",
-            "message": "The requested method is not allowed for this endpoint"
-        }), 405
-
-    @app.errorhandler(500)
-    def internal_error_handler(e):
-        logger.error(f"Internal server error: {e}")
-        return jsonify({
-            "error": "Internal server error",
-            "message": "An unexpected error occurred"
-        }), 500
-
-    # Request logging middleware
-    @app.before_request
-    def log_request_info():
-        logger.info(f"Request: {request.method} {request.path} from {request.remote_addr}")
-
-    @app.after_request
-    def log_response_info(response):
-        logger.info(f"Response: {response.status_code} for {request.method} {request.path}")
-        return response
+    register_error_handlers(app, logger)
+
+    # Sampled structured access log, one line per logged request
+    register_access_log(app, access_logger)
 
     return app
 
@@ -0,0 +1,110 @@
+"""
+app_common.py
+=============
+
+Helpers shared by the Flask applications (app_cloud, app_optimized and
+app_production).
+"""
+
+import contextvars
+import logging
+import os
+import random
+import time
+
+import orjson
+from flask import request
+
+try:
+    # Request counters shared by every worker forked from the gunicorn master
+    from monitor import record_request
+except ImportError:  # psutil not installed
+    record_request = None
+
+# (epoch second, formatted string) of the last timestamp handed out
+_last_timestamp = (0, "")
+
+def timestamp() -> str:
+    """Return the local time as "%Y-%m-%d %H:%M:%S", formatting at most once per second."""
+    global _last_timestamp
+    now = int(time.time())
+    second, formatted = _last_timestamp
+    if now != second:
+        formatted = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        _last_timestamp = (now, formatted)
+    return formatted
+
+# Fraction of successful requests written to the access log; errors are always logged
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '0.05'))
+
+# (method, path, start time) of the current request
+_REQ = contextvars.ContextVar('req')
+
+def register_access_log(app, logger: logging.Logger) -> None:
+    """Record every request in the monitor and log one JSON line per request to
+    ``logger``: every error, and a sample of the rest."""
+    # Skip thread/process name lookups on every log record
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    
+    @app.before_request
+    def start_access():
+        _REQ.set((request.method, request.path, time.monotonic()))
+    
+    @app.after_request
+    def log_access(response):
+        status = response.status_code
+        method, path, t0 = _REQ.get((request.method, request.path, time.monotonic()))
+        elapsed = time.monotonic() - t0
+        if record_request is not None:
+            record_request(elapsed, status >= 400)
+        if (status >= 400 or random.random() < LOG_SAMPLE_RATE) and logger.isEnabledFor(logging.INFO):
+            logger.info(orjson.dumps({
+                "method": method,
+                "path": path,
+                "status": status,
+                "duration_ms": round(elapsed * 1000, 2),
+                "remote_addr": request.remote_addr,
+            }).decode())
+        return response
+
+# Fixed error responses, serialized once
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_ERR_404 = (
+    orjson.dumps({"error": "Not found", "message": "The requested endpoint was not found"}),
+    404,
+    _JSON_HEADERS,
+)
+_ERR_405 = (
+    orjson.dumps({"error": "Method not allowed", "message": "The requested method is not allowed for this endpoint"}),
+    405,
+    _JSON_HEADERS,
+)
+_ERR_500 = (
+    orjson.dumps({"error": "Internal server error", "message": "An unexpected error occurred"}),
+    500,
+    _JSON_HEADERS,
+)
+
+def register_error_handlers(app, logger: logging.Logger) -> None:
+    """Answer 404, 405, 429 and 500 with JSON error bodies, logging 500s to ``logger``."""
+    @app.errorhandler(404)
+    def not_found_handler(e):
+        return _ERR_404
+    
+    @app.errorhandler(405)
+    def method_not_allowed_handler(e):
+        return _ERR_405
+    
+    @app.errorhandler(429)
+    def ratelimit_handler(e):
+        return orjson.dumps({
+            "error": "Rate limit exceeded",
+            "message": str(e.description)
+        }), 429, _JSON_HEADERS
+    
+    @app.errorhandler(500)
+    def internal_error_handler(e):
+        logger.error(f"Internal server error: {e}")
+        return _ERR_500
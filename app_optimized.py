@@ -10,36 +10,218 @@ High-performance Flask application with:
 - Caching
 """
 
+import os
+
+# gevent workers need the stdlib patched before anything opens a socket
+if os.environ.get("FLASK_ENV") == "production":
+    from gevent import monkey
+    monkey.patch_all()
+
+import aiohttp
 import asyncio
-import json
+import atexit
+import concurrent.futures
+import hashlib
+import orjson
+import queue
+import threading
 import time
-from typing import Dict, Any, List
+from operator import itemgetter
+from typing import Dict, Any, List, Tuple
 from flask import Flask, jsonify, request, Response, stream_template
+from flask_compress import Compress
+from flask_orjson import OrjsonProvider
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 import logging
 from contextlib import asynccontextmanager
-import weakref
-import gc
+import psutil
+from cachetools import LRUCache, TTLCache
 
-from scraper_optimized import MemoryOptimizedScraper, search_products_async
+from app_common import register_access_log, register_error_handlers, timestamp
+from config import (
+    CACHE_ENABLED, CACHE_TTL, CONNECTION_POOL_SIZE, MAX_CONCURRENT_PER_HOST, MAX_CONCURRENT_REQUESTS
+)
+from monitor import record_cache_hit, record_cache_miss
+from scraper_optimized import HEADERS, TIMEOUT, MemoryOptimizedScraper, new_event_loop
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Global cache for scraper instances (weak references to avoid memory leaks)
-_scraper_cache = weakref.WeakValueDictionary()
+# Serialized search responses keyed by (query, limit), kept for CACHE_TTL seconds
+_response_cache = TTLCache(maxsize=1024, ttl=CACHE_TTL)
+_response_cache_lock = threading.Lock()
+
+# Process handle and last /health payload, reused for _HEALTH_TTL seconds
+_PROC = psutil.Process()
+_HEALTH_TTL = 5
+_HEALTH_CACHE = {'t': 0.0, 'data': None}
+
+_STREAM_END = object()
+
+# Scrapers are cached per concurrency, so the accepted range also bounds that cache
+_MAX_CONCURRENT_ERROR = f"max_concurrent must be an integer between 1 and {MAX_CONCURRENT_REQUESTS}"
+
+# Seconds a request thread waits on the background loop before giving up
+_RUN_TIMEOUT = int(os.environ.get('SEARCH_TIMEOUT', '120'))
+
+async def _create_session() -> aiohttp.ClientSession:
+    """Create the process-wide HTTP session on the background loop"""
+    connector = aiohttp.TCPConnector(
+        limit=CONNECTION_POOL_SIZE,
+        limit_per_host=MAX_CONCURRENT_PER_HOST,
+        ttl_dns_cache=300,
+        keepalive_timeout=30,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=TIMEOUT, headers=HEADERS)
+
+# Background event loop, the pooled session shared by every scraper, and the
+# scraper cache. Created on first use in each process: a worker forked from a
+# preloading master inherits these objects but not the thread running the loop
+_bg_pid = None
+_bg_lock = threading.Lock()
+_loop = None
+_SESSION = None
+_scraper_cache = None
+_scraper_cache_lock = None
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Return this process's background loop, starting it on first use"""
+    global _bg_pid, _loop, _SESSION, _scraper_cache, _scraper_cache_lock
+    pid = os.getpid()
+    if _bg_pid != pid:
+        with _bg_lock:
+            if _bg_pid != pid:
+                loop = new_event_loop()
+                threading.Thread(target=loop.run_forever, name="scraper-loop", daemon=True).start()
+                _SESSION = asyncio.run_coroutine_threadsafe(_create_session(), loop).result(timeout=_RUN_TIMEOUT)
+                # Keyed by concurrency
+                _scraper_cache = LRUCache(maxsize=32)
+                _scraper_cache_lock = asyncio.Lock()
+                _loop = loop
+                _bg_pid = pid
+    return _loop
+
+async def _get_or_create_scraper(max_concurrent: int) -> MemoryOptimizedScraper:
+    """Return a cached scraper bound to the shared session, creating it on first use"""
+    async with _scraper_cache_lock:
+        scraper = _scraper_cache.get(max_concurrent)
+        if scraper is None:
+            scraper = MemoryOptimizedScraper(max_concurrent, session=_SESSION)
+            await scraper.start()
+            _scraper_cache[max_concurrent] = scraper
+        return scraper
+
+def _shutdown():
+    """Close the shared session on process exit"""
+    if _bg_pid != os.getpid():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_SESSION.close(), _loop).result(timeout=5)
+    except Exception as e:
+        logger.warning(f"Error closing scraper session: {e}")
+
+atexit.register(_shutdown)
+
+def _run(coro):
+    """Run a coroutine on the background loop and wait up to _RUN_TIMEOUT for its result"""
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    try:
+        return future.result(timeout=_RUN_TIMEOUT)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+async def _search(query: str, limit: int, max_concurrent: int) -> List[Dict[str, Any]]:
+    """Search with a cached scraper and return plain dicts"""
+    scraper = await _get_or_create_scraper(max_concurrent)
+    products = [
+        product.to_dict()
+        async for product in scraper.search_products_streaming(query, limit)
+    ]
+    # Products arrive in completion order; responses list them by rank
+    products.sort(key=itemgetter("rank"))
+    return products
+
+async def _search_batch(
+    queries: List[str],
+    max_results_per_query: int,
+    max_concurrent: int
+) -> Tuple[Dict[str, Any], int]:
+    """Run a batch search with a cached scraper, returning results and product count"""
+    scraper = await _get_or_create_scraper(max_concurrent)
+    results = {}
+    total_products = 0
+    async for batch_result in scraper.search_products_batch(queries, max_results_per_query):
+        results.update(batch_result)
+        total_products += sum(map(len, batch_result.values()))
+    return results, total_products
+
+# Static payloads, built once at import
+_INDEX_HTML = (
+    "<h1>Daraz Scraper API - Optimized</h1>"
+    "<p>High-performance, memory-optimized API for scraping Daraz products.</p>"
+    "<h2>Endpoints:</h2>"
+    "<ul>"
+    "<li><code>/test</code> - Test endpoint</li>"
+    "<li><code>/api/search?query=&lt;keywords&gt;&limit=&lt;number&gt;</code> - Search products</li>"
+    "<li><code>/api/search/stream?query=&lt;keywords&gt;&limit=&lt;number&gt;</code> - Stream results</li>"
+    "<li><code>/api/search/batch</code> - Batch search (POST)</li>"
+    "<li><code>/health</code> - Health check</li>"
+    "</ul>"
+    "<h2>Features:</h2>"
+    "<ul>"
+    "<li>✅ Async processing</li>"
+    "<li>✅ Memory optimization</li>"
+    "<li>✅ Connection pooling</li>"
+    "<li>✅ Rate limiting</li>"
+    "<li>✅ Streaming responses</li>"
+    "<li>✅ Batch processing</li>"
+    "</ul>"
+).encode("utf-8")
+
+_TEST_BODY = orjson.dumps({
+    "status": "success",
+    "message": "Daraz Scraper API (Optimized) is working!",
+    "features": [
+        "Async processing",
+        "Memory optimization",
+        "Connection pooling",
+        "Rate limiting",
+        "Streaming responses",
+        "Batch processing"
+    ],
+    "endpoints": {
+        "test": "/test",
+        "search": "/api/search?query=<keywords>&limit=<number>",
+        "search_stream": "/api/search/stream?query=<keywords>&limit=<number>",
+        "search_batch": "/api/search/batch (POST)",
+        "health": "/health",
+        "home": "/"
+    },
+    "example_usage": "/api/search?query=toothpaste&limit=5"
+})
 
 def create_app() -> Flask:
     """Factory to create and configure the optimized Flask application"""
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    
+    # Compress buffered JSON responses; the streaming route is sent as-is
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    app.config['COMPRESS_BR_LEVEL'] = 4
+    app.config['COMPRESS_MIN_SIZE'] = 500
+    app.config['COMPRESS_STREAMS'] = False
+    Compress(app)
     
-    # Configure rate limiting
+    # Route-level rate limiting only; point REDIS_URL at Redis to share counters across workers
     limiter = Limiter(
-        app,
-        key_func=get_remote_address,
-        default_limits=["100 per hour", "10 per minute"]
+        get_remote_address,
+        app=app,
+        storage_uri=os.environ.get('REDIS_URL', 'memory://'),
+        strategy='fixed-window-elastic-expiry',
+        default_limits=[]
     )
     
     # Memory usage tracking
@@ -48,107 +230,101 @@ def create_app() -> Flask:
     @app.route("/")
     def index():
         """Return a simple HTML landing page describing the API"""
-        return (
-            "<h1>Daraz Scraper API - Optimized</h1>"
-            "<p>High-performance, memory-optimized API for scraping Daraz products.</p>"
-            "<h2>Endpoints:</h2>"
-            "<ul>"
-            "<li><code>/test</code> - Test endpoint</li>"
-            "<li><code>/api/search?query=&lt;keywords&gt;&limit=&lt;number&gt;</code> - Search products</li>"
-            "<li><code>/api/search/stream?query=&lt;keywords&gt;&limit=&lt;number&gt;</code> - Stream results</li>"
-            "<li><code>/api/search/batch</code> - Batch search (POST)</li>"
-            "<li><code>/health</code> - Health check</li>"
-            "</ul>"
-            "<h2>Features:</h2>"
-            "<ul>"
-            "<li>✅ Async processing</li>"
-            "<li>✅ Memory optimization</li>"
-            "<li>✅ Connection pooling</li>"
-            "<li>✅ Rate limiting</li>"
-            "<li>✅ Streaming responses</li>"
-            "<li>✅ Batch processing</li>"
-            "</ul>"
-        )
+        return Response(_INDEX_HTML, mimetype="text/html; charset=utf-8")
     
     @app.route("/test")
+    @limiter.exempt
     def test_endpoint():
         """Simple test endpoint to verify the API is working"""
-        return jsonify({
-            "status": "success",
-            "message": "Daraz Scraper API (Optimized) is working!",
-            "features": [
-                "Async processing",
-                "Memory optimization", 
-                "Connection pooling",
-                "Rate limiting",
-                "Streaming responses",
-                "Batch processing"
-            ],
-            "endpoints": {
-                "test": "/test",
-                "search": "/api/search?query=<keywords>&limit=<number>",
-                "search_stream": "/api/search/stream?query=<keywords>&limit=<number>",
-                "search_batch": "/api/search/batch (POST)",
-                "health": "/health",
-                "home": "/"
-            },
-            "example_usage": "/api/search?query=toothpaste&limit=5"
-        }), 200
+        return Response(_TEST_BODY, mimetype="application/json")
     
     @app.route("/health")
+    @limiter.exempt
     def health_check():
         """Health check endpoint"""
-        import psutil
-        import os
+        now = time.monotonic()
+        if now - _HEALTH_CACHE['t'] < _HEALTH_TTL:
+            return jsonify(_HEALTH_CACHE['data']), 200
         
         # Get memory usage
-        process = psutil.Process(os.getpid())
-        memory_info = process.memory_info()
+        info = _PROC.as_dict(attrs=['memory_info', 'memory_percent'])
+        memory_info = info['memory_info']
         
-        return jsonify({
+        data = {
             "status": "healthy",
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "timestamp": timestamp(),
             "memory_usage": {
                 "rss": memory_info.rss,  # Resident Set Size
                 "vms": memory_info.vms,  # Virtual Memory Size
-                "percent": process.memory_percent()
+                "percent": info['memory_percent']
             },
-            "active_connections": len(_scraper_cache)
-        }), 200
+            "active_connections": len(_scraper_cache) if _scraper_cache is not None else 0
+        }
+        _HEALTH_CACHE['t'] = now
+        _HEALTH_CACHE['data'] = data
+        return jsonify(data), 200
     
     @app.route("/api/search")
     @limiter.limit("20 per minute")
-    async def api_search():
+    def api_search():
         """Optimized JSON API endpoint with async processing"""
-        query = request.args.get("query", type=str)
-        limit = request.args.get("limit", default=10, type=int)
-        max_concurrent = request.args.get("max_concurrent", default=5, type=int)
+        args = request.args
+        query = args.get("query")
+        limit_s = args.get("limit")
+        max_concurrent_s = args.get("max_concurrent")
         
         if not query:
             return jsonify({"error": "Missing required parameter: query"}), 400
         
-        if limit > 100:
-            return jsonify({"error": "Limit cannot exceed 100"}), 400
+        try:
+            limit = int(limit_s) if limit_s is not None else 10
+            max_concurrent = int(max_concurrent_s) if max_concurrent_s is not None else 5
+        except ValueError:
+            return jsonify({"error": "Parameters limit and max_concurrent must be integers"}), 400
+        
+        if not 1 <= limit <= 100:
+            return jsonify({"error": "Limit must be between 1 and 100"}), 400
+        
+        if not 1 <= max_concurrent <= MAX_CONCURRENT_REQUESTS:
+            return jsonify({"error": _MAX_CONCURRENT_ERROR}), 400
         
         try:
-            start_time = time.time()
-            
-            # Use async scraper
-            results = await search_products_async(
-                query=query,
-                max_results=limit,
-                max_concurrent=max_concurrent
-            )
+            cache_key = (query, limit)
+            cached = None
+            if CACHE_ENABLED:
+                with _response_cache_lock:
+                    cached = _response_cache.get(cache_key)
+                if cached is None:
+                    record_cache_miss()
+                else:
+                    record_cache_hit()
             
-            processing_time = time.time() - start_time
+            if cached is None:
+                start_time = time.time()
+                
+                # Use a cached async scraper on the background loop
+                results = _run(_search(query, limit, max_concurrent))
+                
+                processing_time = time.time() - start_time
+                
+                etag = hashlib.blake2b(orjson.dumps(results), digest_size=16).hexdigest()
+                body = orjson.dumps({
+                    "query": query,
+                    "results": results,
+                    "count": len(results),
+                    "processing_time": round(processing_time, 2),
+                    "memory_optimized": True
+                })
+                cached = (etag, body)
+                if CACHE_ENABLED:
+                    with _response_cache_lock:
+                        _response_cache[cache_key] = cached
             
-            return jsonify({
-                "query": query,
-                "results": results,
-                "count": len(results),
-                "processing_time": round(processing_time, 2),
-                "memory_optimized": True
-            }), 200
+            etag, body = cached
+            response = Response(body, mimetype='application/json')
+            response.set_etag(etag)
+            response.cache_control.max_age = CACHE_TTL
+            return response.make_conditional(request)
             
         except Exception as e:
             logger.error(f"Error in api_search: {e}")
@@ -156,64 +332,78 @@ def create_app() -> Flask:
     
     @app.route("/api/search/stream")
     @limiter.limit("10 per minute")
-    async def api_search_stream():
+    def api_search_stream():
         """Streaming API endpoint for large result sets"""
-        query = request.args.get("query", type=str)
-        limit = request.args.get("limit", default=10, type=int)
-        max_concurrent = request.args.get("max_concurrent", default=5, type=int)
+        args = request.args
+        query = args.get("query")
+        limit_s = args.get("limit")
+        max_concurrent_s = args.get("max_concurrent")
         
         if not query:
             return jsonify({"error": "Missing required parameter: query"}), 400
         
-        if limit > 1000:
-            return jsonify({"error": "Limit cannot exceed 1000 for streaming"}), 400
+        try:
+            limit = int(limit_s) if limit_s is not None else 10
+            max_concurrent = int(max_concurrent_s) if max_concurrent_s is not None else 5
+        except ValueError:
+            return jsonify({"error": "Parameters limit and max_concurrent must be integers"}), 400
+        
+        if not 1 <= limit <= 1000:
+            return jsonify({"error": "Limit must be between 1 and 1000 for streaming"}), 400
+        
+        if not 1 <= max_concurrent <= MAX_CONCURRENT_REQUESTS:
+            return jsonify({"error": _MAX_CONCURRENT_ERROR}), 400
         
         def generate():
             """Generator for streaming JSON response"""
+            # Start JSON array
+            yield b'{"query":' + orjson.dumps(query) + b',"results":['
+            
+            count = 0
+            producer = None
             try:
-                # Start JSON array
-                yield '{"query": "' + query + '", "results": ['
-                
-                first = True
-                count = 0
+                chunks = queue.SimpleQueue()
                 
                 async def process_products():
-                    nonlocal first, count
-                    async with MemoryOptimizedScraper(max_concurrent) as scraper:
+                    try:
+                        scraper = await _get_or_create_scraper(max_concurrent)
                         async for product in scraper.search_products_streaming(query, limit):
-                            if not first:
-                                yield ','
-                            else:
-                                first = False
-                            
-                            yield json.dumps(product.to_dict(), ensure_ascii=False)
-                            count += 1
-                            
-                            # Force garbage collection every 10 products
-                            if count % 10 == 0:
-                                gc.collect()
+                            # orjson encodes the dataclass natively, no dict needed
+                            chunks.put(orjson.dumps(product))
+                    except Exception as e:
+                        chunks.put(e)
+                    finally:
+                        chunks.put(_STREAM_END)
                 
-                # Run async generator in sync context
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
+                # Drive the async generator on the shared background loop
+                producer = asyncio.run_coroutine_threadsafe(process_products(), _get_loop())
                 
-                try:
-                    async_gen = process_products()
-                    while True:
-                        try:
-                            chunk = loop.run_until_complete(async_gen.__anext__())
-                            yield chunk
-                        except StopAsyncIteration:
-                            break
-                finally:
-                    loop.close()
+                while True:
+                    chunk = chunks.get()
+                    if chunk is _STREAM_END:
+                        break
+                    if isinstance(chunk, Exception):
+                        raise chunk
+                    
+                    if count:
+                        yield b','
+                    yield chunk
+                    count += 1
                 
                 # End JSON array
-                yield f'], "count": {count}, "streaming": true}}'
+                yield b'],"count":' + str(count).encode() + b',"streaming":true}'
                 
             except Exception as e:
                 logger.error(f"Error in streaming: {e}")
-                yield f'{{"error": "{str(e)}"}}'
+                # Close the envelope so clients still receive valid JSON
+                yield (
+                    b'],"count":' + str(count).encode()
+                    + b',"streaming":true,"error":' + orjson.dumps(str(e)) + b'}'
+                )
+            finally:
+                # Also reached via GeneratorExit when the client disconnects mid-stream
+                if producer is not None:
+                    producer.cancel()
         
         return Response(
             generate(),
@@ -227,7 +417,7 @@ def create_app() -> Flask:
     
     @app.route("/api/search/batch", methods=['POST'])
     @limiter.limit("5 per minute")
-    async def api_search_batch():
+    def api_search_batch():
         """Batch search endpoint for multiple queries"""
         try:
             data = request.get_json()
@@ -240,23 +430,21 @@ def create_app() -> Flask:
             
             max_results_per_query = data.get('max_results_per_query', 5)
             max_concurrent = data.get('max_concurrent', 3)
+            if (not isinstance(max_concurrent, int) or isinstance(max_concurrent, bool)
+                    or not 1 <= max_concurrent <= MAX_CONCURRENT_REQUESTS):
+                return jsonify({"error": _MAX_CONCURRENT_ERROR}), 400
             
             start_time = time.time()
-            results = {}
-            
-            async with MemoryOptimizedScraper(max_concurrent) as scraper:
-                async for batch_result in scraper.search_products_batch(
-                    queries, 
-                    max_results_per_query
-                ):
-                    results.update(batch_result)
+            results, total_products = _run(
+                _search_batch(queries, max_results_per_query, max_concurrent)
+            )
             
             processing_time = time.time() - start_time
             
             return jsonify({
                 "queries": queries,
                 "results": results,
-                "total_products": sum(len(products) for products in results.values()),
+                "total_products": total_products,
                 "processing_time": round(processing_time, 2),
                 "batch_processing": True
             }), 200
@@ -266,31 +454,16 @@ def create_app() -> Flask:
             return jsonify({"error": str(e)}), 500
     
     # Error handlers
-    @app.errorhandler(429)
-    def ratelimit_handler(e):
-        return jsonify({
-            "error": "Rate limit exceeded",
-            "message": str(e.description)
-        }), 429
+    register_error_handlers(app, logger)
     
-    @app.errorhandler(500)
-    def internal_error_handler(e):
-        logger.error(f"Internal server error: {e}")
-        return jsonify({
-            "error": "Internal server error",
-            "message": "An unexpected error occurred"
-        }), 500
+    # Request metrics, plus a sampled access log
+    register_access_log(app, logger)
     
-    # Cleanup on app shutdown
-    @app.teardown_appcontext
-    def cleanup(error):
-        """Cleanup resources on app shutdown"""
+    @app.teardown_request
+    def log_request_error(error):
+        """Log requests that ended with an unhandled error"""
         if error:
-            logger.error(f"App context error: {error}")
-        
-        # Clear scraper cache
-        _scraper_cache.clear()
-        gc.collect()
+            logger.error(f"Request error: {error}")
     
     return app
 
@@ -299,7 +472,6 @@ app = create_app()
 
 # For development
 if __name__ == "__main__":
-    import os
     port = int(os.environ.get("PORT", 5000))
     
     # Use async-capable WSGI server for production
@@ -323,12 +495,11 @@ if __name__ == "__main__":
         
         options = {
             'bind': f'0.0.0.0:{port}',
-            'workers': 4,
+            'workers': (2 * (os.cpu_count() or 1)) + 1,
             'worker_class': 'gevent',
             'worker_connections': 1000,
-            'max_requests': 1000,
-            'max_requests_jitter': 50,
-            'preload_app': True,
+            'max_requests': 500,
+            'max_requests_jitter': 200,
             'timeout': 30,
             'keepalive': 2,
         }
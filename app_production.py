@@ -11,6 +11,7 @@ import time
 import logging
 import threading
 from flask import Flask, jsonify, request
+from app_common import register_access_log, register_error_handlers, timestamp
 from scraper import search_products
 
 # Simple rate limiting
@@ -80,7 +81,7 @@ def create_app() -> Flask:
             
             return jsonify({
                 "status": "healthy",
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp": timestamp(),
                 "environment": os.environ.get('FLASK_ENV', 'production'),
                 "memory_usage": {
                     "rss_mb": round(memory_info.rss / 1024 / 1024, 2),
@@ -92,7 +93,7 @@ def create_app() -> Flask:
         except ImportError:
             return jsonify({
                 "status": "healthy",
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp": timestamp(),
                 "environment": os.environ.get('FLASK_ENV', 'production'),
                 "note": "psutil not available for detailed metrics"
             }), 200
@@ -156,7 +157,7 @@ def create_app() -> Flask:
                 "results": results,
                 "count": len(results),
                 "processing_time": round(processing_time, 2),
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+                "timestamp": timestamp()
             }), 200
             
         except Exception as exc:
@@ -171,37 +172,10 @@ def create_app() -> Flask:
             }), 500
 
     # Error handlers
-    @app.errorhandler(404)
-    def not_found_handler(e):
-        return jsonify({
-            "error": "Not found",
-            "message": "The requested endpoint was not found"
-        }), 404
-
-    @app.errorhandler(405)
-    def method_not_allowed_handler(e):
-        return jsonify({
-            "error": "Method not allowed",
-            "message": "The requested method is not allowed for this endpoint"
-        }), 405
-
-    @app.errorhandler(500)
-    def internal_error_handler(e):
-        logger.error(f"Internal server error: {e}")
-        return jsonify({
-            "error": "Internal server error",
-            "message": "An unexpected error occurred"
-        }), 500
-
-    # Request logging middleware
-    @app.before_request
-    def log_request_info():
-        logger.info(f"Request: {request.method} {request.path} from {request.remote_addr}")
+    register_error_handlers(app, logger)
 
-    @app.after_request
-    def log_response_info(response):
-        logger.info(f"Response: {response.status_code} for {request.method} {request.path}")
-        return response
+    # Request logging middleware: one sampled line per request
+    register_access_log(app, logger)
 
     return app
 
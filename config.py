@@ -10,11 +10,14 @@ Configuration file for the optimized Daraz scraper with:
 """
 
 import os
+import sys
 from typing import Dict, Any
 
 class Config:
     """Base configuration class"""
     
+    __slots__ = ()
+    
     # Flask settings
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     DEBUG = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
@@ -56,6 +59,7 @@ class Config:
 
 class DevelopmentConfig(Config):
     """Development configuration"""
+    __slots__ = ()
     DEBUG = True
     MAX_CONCURRENT_REQUESTS = 5
     BATCH_SIZE = 5
@@ -63,6 +67,7 @@ class DevelopmentConfig(Config):
 
 class ProductionConfig(Config):
     """Production configuration"""
+    __slots__ = ()
     DEBUG = False
     MAX_CONCURRENT_REQUESTS = 20
     BATCH_SIZE = 15
@@ -71,6 +76,7 @@ class ProductionConfig(Config):
 
 class TestingConfig(Config):
     """Testing configuration"""
+    __slots__ = ()
     TESTING = True
     MAX_CONCURRENT_REQUESTS = 2
     BATCH_SIZE = 2
@@ -92,6 +98,16 @@ def get_config(config_name: str = None) -> Config:
     
     return config.get(config_name, config['default'])
 
+def _export_config(cfg: Config) -> None:
+    """Expose the active configuration's settings as module-level constants"""
+    module = sys.modules[__name__]
+    for key in dir(cfg):
+        if key.isupper():
+            setattr(module, key, getattr(cfg, key))
+
+# Settings for the current FLASK_ENV, importable as e.g. ``from config import CACHE_TTL``
+_export_config(get_config())
+
 # Performance optimization presets
 PERFORMANCE_PRESETS = {
     'low_memory': {
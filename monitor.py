@@ -10,20 +10,126 @@ Performance monitoring and metrics collection for the optimized scraper:
 """
 
 import asyncio
+import ctypes
+import multiprocessing
+import threading
 import time
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import psutil
 import os
 import json
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Optional
 from dataclasses import dataclass, asdict
-from datetime import datetime, timedelta
-import weakref
+from datetime import datetime, timezone
 import gc
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
-@dataclass
+_RT_SIZE = 1000
+
+# Slots in the shared counter array
+_REQUESTS, _ERRORS, _CACHE_HITS, _CACHE_MISSES = range(4)
+
+_PAGESIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+class _LinuxProcSampler:
+    """Reads process memory and CPU time straight from /proc/self"""
+    
+    def __init__(self):
+        self._pid = None
+        self._statm_fd = None
+        self._stat_fd = None
+        self._clk_tck = os.sysconf('SC_CLK_TCK')
+        self._total_bytes = os.sysconf('SC_PHYS_PAGES') * _PAGESIZE
+        self._last_cpu = None  # (monotonic time, cpu seconds) of the previous sample
+    
+    def _ensure_open(self):
+        """(Re)open the /proc files, including after a fork"""
+        pid = os.getpid()
+        if pid != self._pid:
+            self.close()
+            self._statm_fd = os.open('/proc/self/statm', os.O_RDONLY)
+            self._stat_fd = os.open('/proc/self/stat', os.O_RDONLY)
+            self._pid = pid
+            self._last_cpu = None
+    
+    def close(self):
+        """Close the cached file descriptors"""
+        for fd in (self._statm_fd, self._stat_fd):
+            if fd is not None:
+                os.close(fd)
+        self._statm_fd = self._stat_fd = None
+        self._pid = None
+    
+    def memory(self) -> Dict[str, float]:
+        """Return rss/vms in MB and rss as a percent of physical memory"""
+        self._ensure_open()
+        fields = os.pread(self._statm_fd, 512, 0).split()
+        vms = int(fields[0]) * _PAGESIZE
+        rss = int(fields[1]) * _PAGESIZE
+        return {
+            'rss_mb': rss / 1024 / 1024,
+            'vms_mb': vms / 1024 / 1024,
+            'percent': rss / self._total_bytes * 100
+        }
+    
+    def cpu_percent(self) -> float:
+        """Return CPU percent since the previous call (0.0 on the first call)"""
+        self._ensure_open()
+        data = os.pread(self._stat_fd, 512, 0)
+        # Fields after the "(comm)" entry; utime and stime are fields 14 and 15
+        fields = data[data.rindex(b')') + 2:].split()
+        cpu = (int(fields[11]) + int(fields[12])) / self._clk_tck
+        now = time.monotonic()
+        last, self._last_cpu = self._last_cpu, (now, cpu)
+        if last is None or now <= last[0]:
+            return 0.0
+        return (cpu - last[1]) / (now - last[0]) * 100
+
+class _PsutilSampler:
+    """psutil-backed sampler for platforms without /proc (e.g. Windows)"""
+    
+    def __init__(self):
+        self._proc = None
+    
+    def _process(self) -> psutil.Process:
+        """Return the cached Process, rebuilding it once after a fork"""
+        if self._proc is None or self._proc.pid != os.getpid():
+            self._proc = psutil.Process()
+        return self._proc
+    
+    def memory(self) -> Dict[str, float]:
+        """Return rss/vms in MB and memory percent"""
+        process = self._process()
+        memory_info = process.memory_info()
+        return {
+            'rss_mb': memory_info.rss / 1024 / 1024,  # Resident Set Size in MB
+            'vms_mb': memory_info.vms / 1024 / 1024,  # Virtual Memory Size in MB
+            'percent': process.memory_percent()
+        }
+    
+    def cpu_percent(self) -> float:
+        """Return CPU percent"""
+        return self._process().cpu_percent()
+
+def _make_sampler():
+    """Use /proc on Linux, psutil elsewhere"""
+    if os.path.exists('/proc/self/statm'):
+        try:
+            return _LinuxProcSampler()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Falling back to psutil sampler: {e}")
+    return _PsutilSampler()
+
+@dataclass(slots=True)
 class PerformanceMetrics:
     """Performance metrics data structure"""
     timestamp: str
@@ -34,64 +140,103 @@ class PerformanceMetrics:
     average_response_time: float
     error_rate: float
     cache_hit_rate: float
+    ts_epoch: float
 
 class PerformanceMonitor:
     """Performance monitoring and metrics collection"""
     
+    __slots__ = (
+        'enable_monitoring', 'metrics_history', '_counters', '_counters_lock',
+        '_rt', '_rt_idx', '_rt_full', 'start_time', '_conn_count', '_conn_lock', '_sampler',
+        '_export_pool', '_task', '_vm_cache'
+    )
+    
     def __init__(self, enable_monitoring: bool = True):
         self.enable_monitoring = enable_monitoring
-        self.metrics_history: List[PerformanceMetrics] = []
-        self.request_count = 0
-        self.error_count = 0
-        self.response_times: List[float] = []
-        self.cache_hits = 0
-        self.cache_misses = 0
+        # Keep only last 100 metrics to prevent memory buildup
+        self.metrics_history: deque[PerformanceMetrics] = deque(maxlen=100)
+        # Counters live in shared memory so gunicorn workers forked after
+        # import (preload_app) all add to the same totals
+        self._counters = multiprocessing.RawArray(ctypes.c_uint64, 4)
+        self._counters_lock = multiprocessing.Lock()
+        # Ring buffer of the last _RT_SIZE response times
+        self._rt = array('d', bytes(8 * _RT_SIZE))
+        self._rt_idx = 0
+        self._rt_full = False
         self.start_time = time.time()
-        self._active_connections = weakref.WeakSet()
-        
-        if enable_monitoring:
-            self._start_monitoring()
+        self._conn_count = 0
+        self._conn_lock = threading.Lock()
+        self._sampler = _make_sampler()
+        # Exports run here so callers never block on serialization or disk I/O
+        self._export_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='metrics-export')
+        self._task = None
+        self._vm_cache = (0.0, None)
     
-    def _start_monitoring(self):
-        """Start background monitoring task"""
-        asyncio.create_task(self._monitor_loop())
+    def start(self):
+        """Start background monitoring; call once per process, after any fork"""
+        if not self.enable_monitoring or self._task is not None:
+            return
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop in this thread (e.g. sync gunicorn workers): run one on a daemon thread
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="metrics-monitor", daemon=True).start()
+            self._task = asyncio.run_coroutine_threadsafe(self._monitor_loop(), loop)
+        else:
+            self._task = loop.create_task(self._monitor_loop())
     
     async def _monitor_loop(self):
         """Background monitoring loop"""
+        # Collect metrics every minute on a fixed monotonic schedule so collection time doesn't add drift
+        next_t = time.monotonic()
         while self.enable_monitoring:
             try:
                 await self._collect_metrics()
-                await asyncio.sleep(60)  # Collect metrics every minute
             except Exception as e:
                 logger.error(f"Error in monitoring loop: {e}")
-                await asyncio.sleep(60)
+            
+            next_t += 60.0
+            delay = next_t - time.monotonic()
+            if delay < 0:
+                # Fell behind; restart the schedule from now
+                next_t = time.monotonic()
+            else:
+                await asyncio.sleep(delay)
     
     async def _collect_metrics(self):
-        """Collect current performance metrics"""
+        """Collect current performance metrics with the cyclic collector paused"""
+        # A collection pass mid-sample would skew the CPU and memory readings
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._sample_metrics()
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    
+    def _sample_metrics(self):
+        """Sample current performance metrics into metrics_history"""
         try:
             # Memory usage
-            process = psutil.Process(os.getpid())
-            memory_info = process.memory_info()
-            memory_usage = {
-                'rss_mb': memory_info.rss / 1024 / 1024,  # Resident Set Size in MB
-                'vms_mb': memory_info.vms / 1024 / 1024,  # Virtual Memory Size in MB
-                'percent': process.memory_percent()
-            }
+            memory_usage = self._sampler.memory()
             
             # CPU usage
-            cpu_usage = process.cpu_percent()
+            cpu_usage = self._sampler.cpu_percent()
             
             # Active connections
-            active_connections = len(self._active_connections)
+            active_connections = self._conn_count
             
             # Request metrics
             uptime = time.time() - self.start_time
             requests_per_second = self.request_count / uptime if uptime > 0 else 0
             
             # Response time metrics
+            rt_count = _RT_SIZE if self._rt_full else self._rt_idx
             avg_response_time = (
-                sum(self.response_times) / len(self.response_times)
-                if self.response_times else 0
+                sum(self._rt if self._rt_full else self._rt[:rt_count]) / rt_count
+                if rt_count else 0
             )
             
             # Error rate
@@ -108,57 +253,80 @@ class PerformanceMonitor:
             )
             
             # Create metrics object
+            now = time.time()
             metrics = PerformanceMetrics(
-                timestamp=datetime.now().isoformat(),
+                timestamp=datetime.fromtimestamp(now, tz=timezone.utc).isoformat(timespec='milliseconds'),
                 memory_usage=memory_usage,
                 cpu_usage=cpu_usage,
                 active_connections=active_connections,
                 requests_per_second=requests_per_second,
                 average_response_time=avg_response_time,
                 error_rate=error_rate,
-                cache_hit_rate=cache_hit_rate
+                cache_hit_rate=cache_hit_rate,
+                ts_epoch=now
             )
             
             # Store metrics
             self.metrics_history.append(metrics)
             
-            # Keep only last 100 metrics to prevent memory buildup
-            if len(self.metrics_history) > 100:
-                self.metrics_history = self.metrics_history[-100:]
-            
             # Log metrics
-            logger.info(f"Performance metrics: {asdict(metrics)}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Performance metrics: %s", asdict(metrics))
             
         except Exception as e:
             logger.error(f"Error collecting metrics: {e}")
     
+    @property
+    def request_count(self) -> int:
+        """Requests recorded across all processes sharing this monitor"""
+        return self._counters[_REQUESTS]
+    
+    @property
+    def error_count(self) -> int:
+        """Errors recorded across all processes sharing this monitor"""
+        return self._counters[_ERRORS]
+    
+    @property
+    def cache_hits(self) -> int:
+        """Cache hits recorded across all processes sharing this monitor"""
+        return self._counters[_CACHE_HITS]
+    
+    @property
+    def cache_misses(self) -> int:
+        """Cache misses recorded across all processes sharing this monitor"""
+        return self._counters[_CACHE_MISSES]
+    
     def record_request(self, response_time: float, is_error: bool = False):
         """Record a request and its metrics"""
-        self.request_count += 1
-        self.response_times.append(response_time)
+        with self._counters_lock:
+            self._counters[_REQUESTS] += 1
+            if is_error:
+                self._counters[_ERRORS] += 1
         
-        if is_error:
-            self.error_count += 1
-        
-        # Keep only last 1000 response times
-        if len(self.response_times) > 1000:
-            self.response_times = self.response_times[-1000:]
+        self._rt[self._rt_idx] = response_time
+        self._rt_idx = (self._rt_idx + 1) % _RT_SIZE
+        if self._rt_idx == 0:
+            self._rt_full = True
     
     def record_cache_hit(self):
         """Record a cache hit"""
-        self.cache_hits += 1
+        with self._counters_lock:
+            self._counters[_CACHE_HITS] += 1
     
     def record_cache_miss(self):
         """Record a cache miss"""
-        self.cache_misses += 1
+        with self._counters_lock:
+            self._counters[_CACHE_MISSES] += 1
     
     def add_connection(self, connection):
         """Add a connection to monitoring"""
-        self._active_connections.add(connection)
+        with self._conn_lock:
+            self._conn_count += 1
     
     def remove_connection(self, connection):
         """Remove a connection from monitoring"""
-        self._active_connections.discard(connection)
+        with self._conn_lock:
+            self._conn_count -= 1
     
     def get_current_metrics(self) -> Dict[str, Any]:
         """Get current performance metrics"""
@@ -170,26 +338,33 @@ class PerformanceMonitor:
     
     def get_metrics_summary(self, hours: int = 1) -> Dict[str, Any]:
         """Get metrics summary for the last N hours"""
-        cutoff_time = datetime.now() - timedelta(hours=hours)
+        cutoff = time.time() - hours * 3600
         
-        recent_metrics = [
-            m for m in self.metrics_history
-            if datetime.fromisoformat(m.timestamp) > cutoff_time
-        ]
+        # Sum every field in one pass over the history
+        count = 0
+        total_memory_rss = total_cpu = total_rps = total_response_time = total_error_rate = 0.0
+        for m in self.metrics_history:
+            if m.ts_epoch > cutoff:
+                count += 1
+                total_memory_rss += m.memory_usage['rss_mb']
+                total_cpu += m.cpu_usage
+                total_rps += m.requests_per_second
+                total_response_time += m.average_response_time
+                total_error_rate += m.error_rate
         
-        if not recent_metrics:
+        if not count:
             return {}
         
         # Calculate averages
-        avg_memory_rss = sum(m.memory_usage['rss_mb'] for m in recent_metrics) / len(recent_metrics)
-        avg_cpu = sum(m.cpu_usage for m in recent_metrics) / len(recent_metrics)
-        avg_rps = sum(m.requests_per_second for m in recent_metrics) / len(recent_metrics)
-        avg_response_time = sum(m.average_response_time for m in recent_metrics) / len(recent_metrics)
-        avg_error_rate = sum(m.error_rate for m in recent_metrics) / len(recent_metrics)
+        avg_memory_rss = total_memory_rss / count
+        avg_cpu = total_cpu / count
+        avg_rps = total_rps / count
+        avg_response_time = total_response_time / count
+        avg_error_rate = total_error_rate / count
         
         return {
             'period_hours': hours,
-            'sample_count': len(recent_metrics),
+            'sample_count': count,
             'average_memory_rss_mb': round(avg_memory_rss, 2),
             'average_cpu_percent': round(avg_cpu, 2),
             'average_requests_per_second': round(avg_rps, 2),
@@ -203,15 +378,19 @@ class PerformanceMonitor:
     def get_memory_usage(self) -> Dict[str, Any]:
         """Get detailed memory usage information"""
         try:
-            process = psutil.Process(os.getpid())
-            memory_info = process.memory_info()
+            usage = self._sampler.memory()
+            
+            # System memory changes slowly; re-read /proc/meminfo at most once a second
+            now = time.monotonic()
+            checked_at, vm = self._vm_cache
+            if vm is None or now - checked_at >= 1.0:
+                vm = psutil.virtual_memory()
+                self._vm_cache = (now, vm)
             
             return {
-                'rss_mb': memory_info.rss / 1024 / 1024,
-                'vms_mb': memory_info.vms / 1024 / 1024,
-                'percent': process.memory_percent(),
-                'available_mb': psutil.virtual_memory().available / 1024 / 1024,
-                'total_mb': psutil.virtual_memory().total / 1024 / 1024,
+                **usage,
+                'available_mb': vm.available / 1024 / 1024,
+                'total_mb': vm.total / 1024 / 1024,
                 'gc_counts': gc.get_count(),
                 'gc_threshold': gc.get_threshold()
             }
@@ -237,44 +416,49 @@ class PerformanceMonitor:
             return {'error': str(e)}
     
     def export_metrics(self, filepath: str = None) -> str:
-        """Export metrics to JSON file"""
+        """Export metrics to JSON file in the background and return its path"""
         if filepath is None:
             filepath = f"metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
+        self._export_pool.submit(self._write_metrics, filepath)
+        return filepath
+    
+    def _write_metrics(self, filepath: str):
+        """Collect and write an export; runs on the export thread"""
         try:
             export_data = {
                 'export_timestamp': datetime.now().isoformat(),
                 'summary': self.get_metrics_summary(24),  # Last 24 hours
-                'current_metrics': self.get_current_metrics(),
+                # Dataclass is serialized directly, without an asdict() copy
+                'current_metrics': self.metrics_history[-1] if self.metrics_history else {},
                 'memory_usage': self.get_memory_usage(),
                 'gc_stats': self.force_garbage_collection()
             }
             
-            with open(filepath, 'w') as f:
-                json.dump(export_data, f, indent=2)
+            if orjson is not None:
+                with open(filepath, 'wb') as f:
+                    f.write(orjson.dumps(export_data, option=orjson.OPT_INDENT_2))
+            else:
+                with open(filepath, 'w') as f:
+                    json.dump(export_data, f, indent=2, default=asdict)
             
-            logger.info(f"Metrics exported to {filepath}")
-            return filepath
+            logger.info("Metrics exported to %s", filepath)
             
         except Exception as e:
             logger.error(f"Error exporting metrics: {e}")
-            raise
 
 # Global monitor instance
 monitor = PerformanceMonitor()
 
 # Convenience functions
-def record_request(response_time: float, is_error: bool = False):
-    """Record a request for monitoring"""
-    monitor.record_request(response_time, is_error)
-
-def record_cache_hit():
-    """Record a cache hit"""
-    monitor.record_cache_hit()
+def start():
+    """Start background metrics collection for this process"""
+    monitor.start()
 
-def record_cache_miss():
-    """Record a cache miss"""
-    monitor.record_cache_miss()
+# Hot-path recorders are the bound methods themselves, saving a wrapper call per request
+record_request = monitor.record_request
+record_cache_hit = monitor.record_cache_hit
+record_cache_miss = monitor.record_cache_miss
 
 def get_performance_summary() -> Dict[str, Any]:
     """Get performance summary"""
@@ -295,6 +479,7 @@ if __name__ == "__main__":
     async def test_monitoring():
         """Test the monitoring system"""
         print("Testing performance monitoring...")
+        monitor.start()
         
         # Simulate some requests
         for i in range(10):
@@ -7,9 +7,8 @@ echo Starting Daraz Scraper API in production mode...
 REM Set environment variables
 set FLASK_ENV=production
 set FLASK_DEBUG=False
-set GUNICORN_WORKERS=4
-set GUNICORN_WORKER_CLASS=gevent
-set GUNICORN_WORKER_CONNECTIONS=1000
+set GUNICORN_WORKER_CLASS=gthread
+set GUNICORN_THREADS=8
 set GUNICORN_MAX_REQUESTS=1000
 set GUNICORN_TIMEOUT=30
 set GUNICORN_LOG_LEVEL=info
@@ -7,9 +7,8 @@ echo "Starting Daraz Scraper API in production mode..."
 # Set environment variables
 export FLASK_ENV=production
 export FLASK_DEBUG=False
-export GUNICORN_WORKERS=4
-export GUNICORN_WORKER_CLASS=gevent
-export GUNICORN_WORKER_CONNECTIONS=1000
+export GUNICORN_WORKER_CLASS=gthread
+export GUNICORN_THREADS=8
 export GUNICORN_MAX_REQUESTS=1000
 export GUNICORN_TIMEOUT=30
 export GUNICORN_LOG_LEVEL=info
@@ -9,19 +9,48 @@ This is the recommended way to run Flask apps in production on Windows.
 
 import os
 import sys
+import time
+import atexit
 import logging
+import logging.handlers
+import threading
 from waitress import serve
 from app_production import app
 
+# Seconds between forced flushes of the buffered log file
+LOG_FLUSH_INTERVAL = 1.0
+
 def setup_logging():
     """Setup production logging"""
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    # Buffer file writes; flush on ERROR, when full, every LOG_FLUSH_INTERVAL and at exit
+    file_handler = logging.FileHandler('production.log', mode='a')
+    file_handler.setFormatter(formatter)
+    buffered_handler = logging.handlers.MemoryHandler(
+        capacity=512,
+        flushLevel=logging.ERROR,
+        target=file_handler,
+        flushOnClose=True
+    )
+    atexit.register(buffered_handler.flush)
+    
+    def flush_periodically():
+        while True:
+            time.sleep(LOG_FLUSH_INTERVAL)
+            buffered_handler.flush()
+    
+    threading.Thread(target=flush_periodically, name="log-flush", daemon=True).start()
+    
+    # force=True: importing app_production has already configured the root logger
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         handlers=[
             logging.StreamHandler(sys.stdout),
-            logging.FileHandler('production.log', mode='a')
-        ]
+            buffered_handler
+        ],
+        force=True
     )
 
 def main():
@@ -44,6 +73,8 @@ def main():
         host=host,
         port=port,
         threads=threads,
+        # Keep large JSON responses in memory instead of spilling them to a temp file
+        outbuf_overflow=4 * 1024 * 1024,
         url_scheme='http',
         ident='Daraz-Scraper-API'
     )
@@ -9,20 +9,26 @@ product dictionaries in the same order that Daraz presents them on the
 first results page. Each dictionary includes comprehensive product information
 including name, price, seller details, ratings, and more.
 
-The scraping routines rely on the ``requests`` library to fetch HTML
-pages and ``BeautifulSoup`` to parse them. A modern user agent string
-is supplied with every request to reduce the chance of being blocked.
+The scraping routines rely on a pooled ``urllib3`` connection manager to fetch HTML
+pages and ``selectolax`` (lexbor backend) to parse them. A modern user
+agent string is supplied with every request to reduce the chance of being
+blocked.
 """
 
 from __future__ import annotations
 
 import time
 import re
-from typing import List, Dict, Optional, Any
-from urllib.parse import urljoin, urlparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from typing import List, Dict, Optional, Any, Union
 
-import requests
-from bs4 import BeautifulSoup
+import orjson
+import urllib3
+from cachetools import TTLCache, cached
+from urllib3.util.retry import Retry
+from selectolax.lexbor import LexborHTMLParser as HTMLParser
 
 # Base domain for Daraz Nepal
 BASE_URL = "https://www.daraz.com.np"
@@ -40,58 +46,236 @@ HEADERS = {
     "Upgrade-Insecure-Requests": "1",
 }
 
+# Format of the scraped_at field on every product record
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
 
-def fetch_html(url: str, *, max_retries: int = 3, delay: float = 1.0) -> str:
-    """Fetch HTML content from the given URL with retry logic.
+# Maximum concurrent product detail fetches
+DETAIL_WORKERS = 4
+
+# Shared urllib3 pool so every fetch reuses keep-alive connections to Daraz
+# without going through requests' PreparedRequest/adapter layers
+_POOL = urllib3.PoolManager(
+    num_pools=4,
+    maxsize=16,
+    headers=HEADERS,
+    # Three attempts per request, backing off 1s then 2s; honours Retry-After
+    # on 429/503. Redirects are counted separately so they don't use up retries
+    retries=Retry(
+        total=None,
+        connect=2,
+        read=2,
+        status=2,
+        other=2,
+        redirect=10,
+        backoff_factor=1.0,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+    ),
+    timeout=urllib3.Timeout(total=15.0),
+)
+
+# Upper bound on product page requests per second across all detail workers
+DETAIL_RATE_LIMIT = 4.0
+
+
+class _TokenBucket:
+    """Thread-safe token bucket; ``acquire`` blocks until a request may go out."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        # Reserve a token under the lock, then sleep off any deficit outside it
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._last) * self._rate)
+            self._last = now
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+_DETAIL_BUCKET = _TokenBucket(DETAIL_RATE_LIMIT, DETAIL_RATE_LIMIT)
+
+# Parsed product pages, keyed by URL, reused for DETAIL_CACHE_TTL seconds
+DETAIL_CACHE_TTL = 3600
+_DETAIL_CACHE = TTLCache(maxsize=1024, ttl=DETAIL_CACHE_TTL)
+
+# Long-lived workers for detail fetches, shared by every search in the process
+_DETAIL_POOL = ThreadPoolExecutor(max_workers=DETAIL_WORKERS, thread_name_prefix="daraz-detail")
+
+# Product card containers, tried in order as Daraz may use different structures
+_PRODUCT_CARD_SELECTORS = (
+    "div[data-qa-locator='product-item']",
+    "div.product-item",
+    "div[class*='product-item']",
+    "div[class*='ProductItem']",
+    "div[class*='product-card']",
+    "div[class*='ProductCard']",
+)
+
+# The selector tuples below are tried in priority order. Selectors of equal
+# priority are joined into one comma-separated group, which costs a single
+# tree walk and returns the first match in document order.
+
+# Product name inside a search result card
+_CARD_NAME_SELECTORS = (
+    'div[class*="title"], div[class*="name"]',
+    'h3, h4, h5',
+    'span[class*="title"], span[class*="name"]',
+)
+
+# Price inside a search result card
+_CARD_PRICE_SELECTORS = (
+    'span[class*="price"], div[class*="price"]',
+    'span[class*="currency"], div[class*="currency"]',
+    'span[class*="amount"]',
+)
+
+# Product detail page fields
+_NAME_SELECTORS = (
+    'h1[class*="product-name"]',
+    'h1[class*="title"]',
+    'h1',
+    'span[class*="pdp-product-name"], div[class*="product-name"]',
+)
+
+_PRICE_SELECTORS = (
+    'span[class*="pdp-price"]',
+    'span[class*="current-price"], span[class*="price-current"], div[class*="price-current"]',
+    'span[class*="currency"]',
+)
+
+_ORIGINAL_PRICE_SELECTORS = (
+    'span[class*="original-price"], span[class*="price-original"], '
+    'span[class*="price-before"], div[class*="price-original"]',
+)
+
+_DISCOUNT_SELECTORS = (
+    'span[class*="discount"], div[class*="discount"]',
+    'span[class*="sale"], div[class*="sale"]',
+)
+
+_RATING_SELECTORS = (
+    'span[class*="rating"], div[class*="rating"]',
+    'span[class*="score"], div[class*="score"]',
+)
+
+_REVIEW_SELECTORS = (
+    'span[class*="review"], div[class*="review"]',
+    'span[class*="comment"], div[class*="comment"]',
+)
+
+# Only the store-name anchor: generic seller containers would return the whole seller block
+_SELLER_SELECTORS = (
+    'div.seller-name__detail a.seller-name__detail-name',
+)
+
+_BRAND_SELECTORS = (
+    'span[class*="brand"], div[class*="brand"], a[class*="brand"]',
+)
+
+_AVAILABILITY_SELECTORS = (
+    'span[class*="stock"], div[class*="stock"]',
+    'span[class*="availability"], div[class*="availability"]',
+)
+
+_DESCRIPTION_SELECTORS = (
+    'div[class*="description"], p[class*="description"]',
+    'div[class*="detail"]',
+    'div[class*="content"]',
+)
+
+# Detail fields filled from the first matching selector, in extraction order:
+# (key, selectors, needs_digit). needs_digit skips matches without a number
+# (e.g. empty rating widgets)
+_DETAIL_FIELDS = (
+    ("product_name", _NAME_SELECTORS, False),
+    ("price", _PRICE_SELECTORS, False),
+    ("original_price", _ORIGINAL_PRICE_SELECTORS, False),
+    ("discount", _DISCOUNT_SELECTORS, False),
+    ("rating", _RATING_SELECTORS, True),
+    ("review_count", _REVIEW_SELECTORS, True),
+    ("seller_name", _SELLER_SELECTORS, False),
+    ("brand", _BRAND_SELECTORS, False),
+    ("availability", _AVAILABILITY_SELECTORS, False),
+    ("description", _DESCRIPTION_SELECTORS, False),
+)
+
+# Every product detail record has this shape; records start as a copy of it
+_EMPTY_DETAILS: Dict[str, Any] = {
+    "product_name": "",
+    "price": "",
+    "original_price": "",
+    "discount": "",
+    "rating": "",
+    "review_count": "",
+    "seller_name": "",
+    "seller_location": "",
+    "seller_rating": "",
+    "brand": "",
+    "category": "",
+    "availability": "",
+    "description": "",
+    "specifications": None,
+    "product_url": "",
+    "rank": 0,
+    "scraped_at": "",
+}
+
+# Search function that finds the first digit, used to validate price/rating/review text
+_HAS_DIGIT = re.compile(r"\d").search
+
+# Links to product detail pages
+_PRODUCT_LINK_SELECTOR = 'a[href*="/products/"]'
+
+
+def fetch_html(url: str) -> bytes:
+    """Fetch HTML content from the given URL.
+    
+    Connection errors and 429/5xx responses are retried with exponential
+    backoff by the pool's retry policy.
     
     Args:
         url: The absolute URL to request.
-        max_retries: How many times to retry on network failure.
-        delay: Base delay in seconds between retries.
         
     Returns:
-        The raw HTML document as a string.
+        The raw (undecoded) HTML document. selectolax parses bytes as UTF-8
+        without charset sniffing, which matches what daraz.com.np serves.
         
     Raises:
-        requests.HTTPError: If the final attempt does not return HTTP 200.
+        urllib3.exceptions.HTTPError: If the request still fails after retries
+            or returns an error status.
     """
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(url, headers=HEADERS, timeout=15)
-            response.raise_for_status()
-            return response.text
-        except Exception as e:
-            if attempt == max_retries - 1:
-                raise
-            time.sleep(delay * (2 ** attempt))
-    raise RuntimeError("Unreachable code in fetch_html")
+    response = _POOL.request("GET", url)
+    if response.status >= 400:
+        raise urllib3.exceptions.HTTPError(f"{response.status} Error for url: {url}")
+    return response.data
 
 
-def parse_search_results(html: str) -> List[Dict[str, str]]:
+def parse_search_results(html: Union[str, bytes], limit: Optional[int] = None) -> List[Dict[str, str]]:
     """Parse the search results page into a list of product summaries.
     
     Args:
-        html: The raw HTML string of a Daraz search page.
+        html: The raw HTML (str or bytes) of a Daraz search page.
+        limit: Stop once this many products have been parsed. Defaults to all.
         
     Returns:
         A list of dictionaries with keys ``name``, ``price``, ``url``, ``image_url``.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    tree = HTMLParser(html)
     products: List[Dict[str, str]] = []
     
     # Try multiple selectors for product cards as Daraz may use different structures
-    product_selectors = [
-        "div[data-qa-locator='product-item']",
-        "div.product-item",
-        "div[class*='product-item']",
-        "div[class*='ProductItem']",
-        "div[class*='product-card']",
-        "div[class*='ProductCard']"
-    ]
-    
     product_cards = []
-    for selector in product_selectors:
-        cards = soup.select(selector)
+    for selector in _PRODUCT_CARD_SELECTORS:
+        cards = tree.css(selector)
         if cards:
             product_cards = cards
             break
@@ -99,71 +283,58 @@ def parse_search_results(html: str) -> List[Dict[str, str]]:
     # If no specific product cards found, try to find any div containing product links
     if not product_cards:
         # Look for links containing '/products/'
-        product_links = soup.find_all('a', href=re.compile(r'/products/'))
+        product_links = tree.css(_PRODUCT_LINK_SELECTOR)
         for link in product_links:
             # Find the parent container that likely contains the product info
-            parent = link.find_parent(['div', 'article', 'section'])
-            if parent:
+            parent = link.parent
+            while parent is not None and parent.tag not in ('div', 'article', 'section'):
+                parent = parent.parent
+            if parent is not None:
                 product_cards.append(parent)
     
     for card in product_cards:
+        if limit is not None and len(products) >= limit:
+            break
+        
         try:
             # Extract product link
-            link = card.find('a', href=re.compile(r'/products/'))
+            link = card.css_first(_PRODUCT_LINK_SELECTOR)
             if not link:
                 continue
                 
-            href = link.get('href', '')
+            href = link.attributes.get('href') or ''
             if not href:
                 continue
                 
-            # Build full URL
-            if href.startswith('//'):
-                product_url = 'https:' + href
-            elif href.startswith('/'):
-                product_url = BASE_URL + href
-            elif href.startswith('http'):
+            # Build full URL, dispatching on the leading character
+            lead = href[0]
+            if lead == '/':
+                product_url = ('https:' + href) if href[:2] == '//' else (BASE_URL + href)
+            elif lead == 'h' and href[:4] == 'http':
                 product_url = href
             else:
                 product_url = BASE_URL + '/' + href
             
             # Extract product name
-            name_selectors = [
-                'div[class*="title"]',
-                'div[class*="name"]',
-                'div[class*="product-name"]',
-                'h3', 'h4', 'h5',
-                'span[class*="title"]',
-                'span[class*="name"]'
-            ]
-            
             product_name = None
-            for selector in name_selectors:
-                name_elem = card.select_one(selector)
+            for selector in _CARD_NAME_SELECTORS:
+                name_elem = card.css_first(selector)
                 if name_elem:
-                    product_name = name_elem.get_text(strip=True)
+                    product_name = name_elem.text(strip=True)
                     if product_name and len(product_name) > 3:  # Ensure it's not just whitespace
                         break
             
             if not product_name:
                 # Try to get text from the link itself
-                product_name = link.get_text(strip=True)
+                product_name = link.text(strip=True)
             
             # Extract price
-            price_selectors = [
-                'span[class*="price"]',
-                'div[class*="price"]',
-                'span[class*="currency"]',
-                'div[class*="currency"]',
-                'span[class*="amount"]'
-            ]
-            
             price_text = None
-            for selector in price_selectors:
-                price_elem = card.select_one(selector)
+            for selector in _CARD_PRICE_SELECTORS:
+                price_elem = card.css_first(selector)
                 if price_elem:
-                    price_text = price_elem.get_text(strip=True)
-                    if price_text and any(char.isdigit() for char in price_text):
+                    price_text = price_elem.text().strip()
+                    if price_text and _HAS_DIGIT(price_text):
                         break
             
             if product_name and product_url:
@@ -180,197 +351,41 @@ def parse_search_results(html: str) -> List[Dict[str, str]]:
     return products
 
 
-def parse_product_details(html: str, product_url: str) -> Dict[str, Any]:
+def parse_product_details(html: Union[str, bytes], product_url: str,
+                          scraped_at: Optional[str] = None) -> Dict[str, Any]:
     """Parse a product detail page and extract comprehensive information.
     
     Args:
-        html: The raw HTML string of a Daraz product page.
+        html: The raw HTML (str or bytes) of a Daraz product page.
         product_url: The URL of the product page.
+        scraped_at: Timestamp to record on the result. Defaults to now.
         
     Returns:
         A dictionary containing detailed product information.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    tree = HTMLParser(html)
     
     # Initialize result dictionary
     product_details = {
-        "product_name": "",
-        "price": "",
-        "original_price": "",
-        "discount": "",
-        "rating": "",
-        "review_count": "",
-        "seller_name": "",
-        "seller_location": "",
-        "seller_rating": "",
-        "brand": "",
-        "category": "",
-        "availability": "",
-        "description": "",
+        **_EMPTY_DETAILS,
         "specifications": {},
         "product_url": product_url,
-        "rank": 0,
-        "scraped_at": time.strftime("%Y-%m-%d %H:%M:%S")
+        "scraped_at": time.strftime(TIMESTAMP_FORMAT) if scraped_at is None else scraped_at
     }
     
     try:
-        # Extract product name
-        name_selectors = [
-            'h1[class*="pdp-product-name"]',
-            'h1[class*="product-name"]',
-            'h1[class*="title"]',
-            'h1',
-            'span[class*="pdp-product-name"]',
-            'div[class*="product-name"]'
-        ]
-        
-        for selector in name_selectors:
-            name_elem = soup.select_one(selector)
-            if name_elem:
-                product_details["product_name"] = name_elem.get_text(strip=True)
-                break
-        
-        # Extract current price
-        price_selectors = [
-            'span[class*="pdp-price"]',
-            'span[class*="current-price"]',
-            'span[class*="price-current"]',
-            'div[class*="price-current"]',
-            'span[class*="currency"]'
-        ]
-        
-        for selector in price_selectors:
-            price_elem = soup.select_one(selector)
-            if price_elem:
-                product_details["price"] = price_elem.get_text(strip=True)
-                break
-        
-        # Extract original price
-        original_price_selectors = [
-            'span[class*="original-price"]',
-            'span[class*="price-original"]',
-            'span[class*="price-before"]',
-            'div[class*="price-original"]'
-        ]
-        
-        for selector in original_price_selectors:
-            orig_price_elem = soup.select_one(selector)
-            if orig_price_elem:
-                product_details["original_price"] = orig_price_elem.get_text(strip=True)
-                break
-        
-        # Extract discount
-        discount_selectors = [
-            'span[class*="discount"]',
-            'div[class*="discount"]',
-            'span[class*="sale"]',
-            'div[class*="sale"]'
-        ]
-        
-        for selector in discount_selectors:
-            discount_elem = soup.select_one(selector)
-            if discount_elem:
-                product_details["discount"] = discount_elem.get_text(strip=True)
-                break
-        
-        # Extract rating
-        rating_selectors = [
-            'span[class*="rating"]',
-            'div[class*="rating"]',
-            'span[class*="score"]',
-            'div[class*="score"]'
-        ]
-        
-        for selector in rating_selectors:
-            rating_elem = soup.select_one(selector)
-            if rating_elem:
-                rating_text = rating_elem.get_text(strip=True)
-                if rating_text and any(char.isdigit() for char in rating_text):
-                    product_details["rating"] = rating_text
+        css_first = tree.css_first
+        for key, selectors, needs_digit in _DETAIL_FIELDS:
+            for selector in selectors:
+                elem = css_first(selector)
+                if elem:
+                    # Generic fallbacks match container divs, so strip every text node
+                    text = elem.text(strip=True)
+                    if needs_digit and not (text and _HAS_DIGIT(text)):
+                        continue
+                    product_details[key] = text
                     break
         
-        # Extract review count
-        review_selectors = [
-            'span[class*="review"]',
-            'div[class*="review"]',
-            'span[class*="comment"]',
-            'div[class*="comment"]'
-        ]
-        
-        for selector in review_selectors:
-            review_elem = soup.select_one(selector)
-            if review_elem:
-                review_text = review_elem.get_text(strip=True)
-                if review_text and any(char.isdigit() for char in review_text):
-                    product_details["review_count"] = review_text
-                    break
-        
-        # Extract seller information using the specific selector you provided
-        try:
-            seller_elem = soup.select_one('div.seller-name__detail a.seller-name__detail-name')
-            if seller_elem:
-                product_details["seller_name"] = seller_elem.get_text(strip=True)
-        except:
-            # Fallback to other selectors if the specific one doesn't work
-            seller_selectors = [
-                'a[class*="seller"]',
-                'div[class*="seller"]',
-                'span[class*="seller"]',
-                'a[href*="seller"]'
-            ]
-            
-            for selector in seller_selectors:
-                try:
-                    seller_elem = soup.select_one(selector)
-                    if seller_elem:
-                        product_details["seller_name"] = seller_elem.get_text(strip=True)
-                        break
-                except:
-                    continue
-        
-        # Extract brand
-        brand_selectors = [
-            'span[class*="brand"]',
-            'div[class*="brand"]',
-            'a[class*="brand"]'
-        ]
-        
-        for selector in brand_selectors:
-            brand_elem = soup.select_one(selector)
-            if brand_elem:
-                product_details["brand"] = brand_elem.get_text(strip=True)
-                break
-        
-        # Extract availability
-        availability_selectors = [
-            'span[class*="stock"]',
-            'div[class*="stock"]',
-            'span[class*="availability"]',
-            'div[class*="availability"]'
-        ]
-        
-        for selector in availability_selectors:
-            avail_elem = soup.select_one(selector)
-            if avail_elem:
-                product_details["availability"] = avail_elem.get_text(strip=True)
-                break
-        
-        # Image extraction removed for cleaner response
-        
-        # Extract description
-        desc_selectors = [
-            'div[class*="description"]',
-            'div[class*="detail"]',
-            'div[class*="content"]',
-            'p[class*="description"]'
-        ]
-        
-        for selector in desc_selectors:
-            desc_elem = soup.select_one(selector)
-            if desc_elem:
-                product_details["description"] = desc_elem.get_text(strip=True)
-                break
-        
     except Exception as e:
         # If there's an error, at least return the basic info we have
         pass
@@ -378,38 +393,39 @@ def parse_product_details(html: str, product_url: str) -> Dict[str, Any]:
     return product_details
 
 
-def get_product_details(product_url: str) -> Dict[str, Any]:
+@cached(_DETAIL_CACHE, lock=threading.Lock())
+def _fetch_product_details(product_url: str) -> Dict[str, Any]:
+    """Fetch and parse a product page. Results are cached per URL; failures are not."""
+    _DETAIL_BUCKET.acquire()
+    # Callers stamp their own scraped_at on a copy, so none is formatted here
+    return parse_product_details(fetch_html(product_url), product_url, scraped_at="")
+
+
+def get_product_details(product_url: str, scraped_at: Optional[str] = None) -> Dict[str, Any]:
     """Fetch a product page and extract detailed information.
     
     Args:
         product_url: The absolute URL of the product page.
+        scraped_at: Timestamp to record on the result. Defaults to now.
         
     Returns:
         A dictionary containing detailed product information.
     """
+    if scraped_at is None:
+        scraped_at = time.strftime(TIMESTAMP_FORMAT)
     try:
-        html = fetch_html(product_url)
-        return parse_product_details(html, product_url)
+        details = dict(_fetch_product_details(product_url))
+        details["scraped_at"] = scraped_at
+        return details
     except Exception as e:
         # Return basic info if detailed scraping fails
         return {
+            **_EMPTY_DETAILS,
             "product_name": "Product details unavailable",
             "price": "Price unavailable",
-            "original_price": "",
-            "discount": "",
-            "rating": "",
-            "review_count": "",
-            "seller_name": "",
-            "seller_location": "",
-            "seller_rating": "",
-            "brand": "",
-            "category": "",
-            "availability": "",
-            "description": "",
             "specifications": {},
             "product_url": product_url,
-            "rank": 0,
-            "scraped_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "scraped_at": scraped_at,
             "error": str(e)
         }
 
@@ -417,7 +433,7 @@ def get_product_details(product_url: str) -> Dict[str, Any]:
 def search_products(query: str, *, max_results: int = 10) -> List[Dict[str, Any]]:
     """Search Daraz for a keyword and return comprehensive product details.
     
-    This function first tries the basic requests-based approach, and if that fails
+    This function first tries the plain HTTP approach, and if that fails
     (likely due to JavaScript-rendered content), it falls back to Selenium.
     
     Args:
@@ -429,12 +445,12 @@ def search_products(query: str, *, max_results: int = 10) -> List[Dict[str, Any]
     """
     try:
         # Build the search URL
-        encoded_query = requests.utils.quote(query)
+        encoded_query = quote(query)
         search_url = f"{BASE_URL}/catalog/?q={encoded_query}"
         
         # Fetch search results
         search_html = fetch_html(search_url)
-        product_summaries = parse_search_results(search_html)
+        product_summaries = parse_search_results(search_html, limit=max_results)
         
         if not product_summaries:
             # If basic scraping returns no results, try Selenium
@@ -449,15 +465,18 @@ def search_products(query: str, *, max_results: int = 10) -> List[Dict[str, Any]
                 print(f"Selenium scraping failed: {str(e)}")
                 return []
         
-        # Limit results
-        product_summaries = product_summaries[:max_results]
-        
-        # Get detailed information for each product
+        # Get detailed information for each product; pages are fetched
+        # concurrently but collected in search order so ranks are preserved
         results: List[Dict[str, Any]] = []
-        for i, summary in enumerate(product_summaries):
+        # One timestamp for the whole batch
+        scraped_at = time.strftime(TIMESTAMP_FORMAT)
+        futures = [_DETAIL_POOL.submit(get_product_details, summary["url"], scraped_at)
+                   for summary in product_summaries]
+        
+        for i, (summary, future) in enumerate(zip(product_summaries, futures)):
             try:
                 # Get detailed product information
-                detailed_info = get_product_details(summary["url"])
+                detailed_info = future.result()
                 
                 # Merge summary info with detailed info
                 result = {
@@ -469,9 +488,6 @@ def search_products(query: str, *, max_results: int = 10) -> List[Dict[str, Any]
                 
                 results.append(result)
                 
-                # Add a small delay to be respectful to the server
-                time.sleep(0.5)
-                
             except Exception as e:
                 # If detailed scraping fails, at least return the summary info
                 results.append({
@@ -497,4 +513,13 @@ def search_products(query: str, *, max_results: int = 10) -> List[Dict[str, Any]
             return [{"error": f"Search failed: {str(e)}"}]
         except Exception as selenium_error:
             print(f"Selenium also failed: {str(selenium_error)}")
-            return [{"error": f"Search failed: {str(e)}. Selenium error: {str(selenium_error)}"}]
\ No newline at end of file
+            return [{"error": f"Search failed: {str(e)}. Selenium error: {str(selenium_error)}"}]
+
+
+def search_products_json(query: str, *, max_results: int = 10) -> bytes:
+    """Run :func:`search_products` and return the results as UTF-8 JSON bytes.
+    
+    Serialisation goes through ``orjson`` so callers writing results to disk
+    or a socket skip the pure-Python ``json`` encoder.
+    """
+    return orjson.dumps(search_products(query, max_results=max_results))
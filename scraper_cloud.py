@@ -6,16 +6,168 @@ Cloud-optimized scraper that handles environments without Chrome browser.
 Falls back to basic HTTP scraping when Selenium is not available.
 """
 
+import orjson
 import requests
-from bs4 import BeautifulSoup
+import atexit
+import logging
+import threading
 import time
 import re
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 from typing import List, Dict, Any, Optional
-from urllib.parse import urlencode, urljoin
+from urllib.parse import quote_plus
+from cachetools import TTLCache, cached
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from selectolax.lexbor import LexborHTMLParser
+
+logger = logging.getLogger(__name__)
 
 # Base URL for Daraz Nepal
 BASE_URL = "https://www.daraz.com.np"
 
+# Search URLs are this prefix followed by the quoted query
+SEARCH_URL_PREFIX = BASE_URL + "/catalog/?q="
+
+# Headers to mimic a real browser
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+# Maximum product pages fetched at once
+DETAIL_WORKERS = 10
+
+# Shared session so search and product fetches reuse keep-alive connections
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.3),
+))
+
+# Fetched page bodies, keyed by URL and bounded by total size in bytes
+PAGE_CACHE_TTL = 3600
+_PAGE_CACHE = TTLCache(maxsize=32 * 1024 * 1024, ttl=PAGE_CACHE_TTL, getsizeof=len)
+
+# Long-lived workers for product page fetches, shared by every search in the process
+_DETAIL_POOL = ThreadPoolExecutor(max_workers=DETAIL_WORKERS, thread_name_prefix="daraz-cloud-detail")
+
+# Format of the scraped_at field on every product record
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Every product record has this shape; records start as a copy of it
+_EMPTY_PRODUCT: Dict[str, Any] = {
+    "product_name": "",
+    "price": "",
+    "original_price": "",
+    "discount": "",
+    "rating": "",
+    "review_count": "",
+    "seller_name": "",
+    "seller_location": "",
+    "brand": "",
+    "availability": "",
+    "product_url": "",
+    "rank": 0,
+    "scraped_at": "",
+}
+
+# Search-card fields as selector groups, tried in priority order; within a
+# group one engine call returns every match in document order
+_CARD_NAME_SELECTORS = (
+    'div[class*="title"], div[class*="name"]',
+    'h3, h4, h5',
+    'span[class*="title"], span[class*="name"], a[class*="title"]',
+)
+_CARD_PRICE_SELECTORS = (
+    'span[class*="price"], div[class*="price"]',
+    'span[class*="currency"], div[class*="currency"]',
+)
+_CARD_RATING_SELECTOR = 'span[class*="rating"], div[class*="rating"]'
+_CARD_REVIEW_SELECTOR = 'span[class*="review"], div[class*="review"]'
+
+# Product page fields; the first match in document order wins
+_PAGE_NAME_SELECTOR = 'h1[class*="product-name"], h1[class*="title"], h1'
+_PAGE_PRICE_SELECTOR = 'span[class*="price"], div[class*="price"]'
+_PAGE_SELLER_SELECTOR = 'div.seller-name__detail a.seller-name__detail-name, a[class*="seller"], div[class*="seller"]'
+
+# Selenium fallbacks, tried in order; name and price use selector groups
+# so each group costs one driver round-trip
+_SELENIUM_CARD_SELECTORS = (
+    "div[data-qa-locator='product-item']",
+    "div[class*='product-item']",
+    "div[class*='ProductItem']",
+    "div[class*='product-card']",
+)
+_SELENIUM_NAME_SELECTORS = (
+    "div.RfADt",
+    "a[href*='/products/']",
+    "div[class*='title'], div[class*='name'], h3, h4, h5",
+)
+_SELENIUM_PRICE_SELECTORS = (
+    "span[class*='price'], div[class*='price']",
+    "span[class*='currency']",
+)
+
+# Shared headless Chrome, created by _get_driver() on the first Selenium search
+_DRIVER = None
+_DRIVER_LOCK = threading.Lock()
+
+# Subresources Chrome never needs to fetch for the listing. Stylesheets stay
+# allowed because innerText depends on computed visibility
+_SELENIUM_BLOCKED_URLS = (
+    "*.png", "*.jpg", "*.jpeg", "*.webp", "*.gif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.mp4",
+    "*/analytics*", "*doubleclick*", "*googletagmanager*",
+)
+
+# Reads url/name/price/rating from the first N cards in the page. Arguments:
+# card selector, limit, name selector groups, price selector groups, rating selector
+_SELENIUM_EXTRACT_JS = """
+const [cardSelector, limit, nameGroups, priceGroups, ratingSelector] = arguments;
+const isPrice = t => t.includes('Rs.') || /\\d/.test(t);
+const pick = (card, groups, accept) => {
+    for (const group of groups) {
+        for (const el of card.querySelectorAll(group)) {
+            const text = el.innerText.trim();
+            if (text && accept(text)) return text;
+        }
+    }
+    return '';
+};
+return Array.from(document.querySelectorAll(cardSelector)).slice(0, limit).map(card => {
+    const link = card.querySelector("a[href*='/products/']");
+    const rating = card.querySelector(ratingSelector);
+    return {
+        url: link ? link.href : '',
+        name: pick(card, nameGroups, t => true),
+        price: pick(card, priceGroups, isPrice),
+        rating: rating ? rating.innerText.trim() : '',
+    };
+});
+"""
+
+# Every node search_products_basic may use from a listing: product cards,
+# class-based card fallbacks and bare product links
+_LISTING_CANDIDATES_SELECTOR = (
+    "div[data-qa-locator='product-item'], "
+    "div[class*='product'][class*='item'], "
+    "a[href*='/products/']"
+)
+
+# The listing's product data as JSON, assigned to window.pageData in an inline script
+_PAGE_DATA_RE = re.compile(rb'window\.pageData\s*=\s*(\{.*?\})\s*;?\s*</script>', re.DOTALL)
+
+# Search function that finds the first digit, used to validate price text
+_HAS_DIGIT = re.compile(r"\d").search
+
 def search_products_cloud(query: str, max_results: int = 10) -> List[Dict[str, Any]]:
     """
     Search for products on Daraz Nepal with cloud-optimized approach.
@@ -31,27 +183,34 @@ def search_products_cloud(query: str, max_results: int = 10) -> List[Dict[str, A
         # First try basic HTTP scraping (works in cloud)
         results = search_products_basic(query, max_results)
         if results:
-            print(f"Basic scraping found {len(results)} results")
+            logger.info("Basic scraping found %d results", len(results))
             return results
         
         # If basic scraping fails, try Selenium (may not work in cloud)
-        print("Basic scraping returned no results, trying Selenium...")
+        logger.info("Basic scraping returned no results, trying Selenium...")
         try:
             results = search_products_selenium_cloud(query, max_results)
             if results:
-                print(f"Selenium scraping found {len(results)} results")
+                logger.info("Selenium scraping found %d results", len(results))
                 return results
         except Exception as e:
-            print(f"Selenium scraping failed: {e}")
+            logger.warning("Selenium scraping failed: %s", e)
         
         # If both fail, return empty results
-        print("All scraping methods failed")
+        logger.warning("All scraping methods failed")
         return []
         
     except Exception as e:
-        print(f"Error in search_products_cloud: {e}")
+        logger.error("Error in search_products_cloud: %s", e)
         return []
 
+@cached(_PAGE_CACHE, key=lambda url, timeout: url, lock=threading.Lock())
+def _fetch_page(url: str, timeout: float) -> bytes:
+    """GET a page on the shared session. Bodies are cached per URL; errors are not."""
+    response = _SESSION.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.content
+
 def search_products_basic(query: str, max_results: int = 10) -> List[Dict[str, Any]]:
     """
     Basic HTTP scraping without Selenium.
@@ -59,89 +218,164 @@ def search_products_basic(query: str, max_results: int = 10) -> List[Dict[str, A
     """
     try:
         # Construct search URL
-        search_url = f"{BASE_URL}/catalog/?q={urlencode({'q': query})[2:]}"
-        print(f"Loading search page: {search_url}")
-        
-        # Set headers to mimic a real browser
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
+        search_url = SEARCH_URL_PREFIX + quote_plus(query)
+        logger.info("Loading search page: %s", search_url)
         
         # Make request with timeout
-        response = requests.get(search_url, headers=headers, timeout=30)
-        response.raise_for_status()
+        html = _fetch_page(search_url, 30)
         
-        # Parse HTML
-        soup = BeautifulSoup(response.content, 'html.parser')
+        # Prefer the product data embedded in the page; fall back to the DOM
+        results = parse_page_data(html, max_results)
+        if results is not None:
+            logger.info("Found %d products in embedded page data", len(results))
+            return results
         
-        # Look for product containers
-        product_elements = soup.find_all('div', {'data-qa-locator': 'product-item'})
+        # Parse HTML
+        tree = LexborHTMLParser(html)
+        
+        # Collect product containers, class-based fallbacks and product links
+        # in one pass over the tree, then use the most specific non-empty list
+        product_elements, class_matches, product_links = [], [], []
+        for node in tree.css(_LISTING_CANDIDATES_SELECTOR):
+            attrs = node.attributes
+            if node.tag == 'a':
+                product_links.append(node)
+                continue
+            if attrs.get('data-qa-locator') == 'product-item':
+                product_elements.append(node)
+            class_name = attrs.get('class') or ''
+            if 'product' in class_name and 'item' in class_name:
+                class_matches.append(node)
         
         if not product_elements:
             # Try alternative selectors
-            product_elements = soup.find_all('div', class_=re.compile(r'product.*item|item.*product'))
+            product_elements = class_matches
         
         if not product_elements:
             # Look for product links
-            product_links = soup.find_all('a', href=re.compile(r'/products/'))
             if product_links:
-                # Extract unique product URLs
-                product_urls = list(set([link.get('href') for link in product_links if link.get('href')]))
+                # Extract unique product URLs, keeping page order so ranks are stable
+                product_urls = list(dict.fromkeys(href for href in (link.attributes.get('href') for link in product_links) if href))
                 return get_products_from_urls_basic(product_urls[:max_results])
         
         if not product_elements:
-            print("No product elements found")
+            logger.info("No product elements found")
             return []
         
-        print(f"Found {len(product_elements)} products using basic scraping")
+        logger.info("Found %d products using basic scraping", len(product_elements))
         
-        # Extract product information
+        # Extract product information; cards share a template, so the selector
+        # that matched a field on one card is tried first on the next
         results = []
+        winners: Dict[str, str] = {}
+        scraped_at = time.strftime(TIMESTAMP_FORMAT)
         for i, element in enumerate(product_elements[:max_results]):
             try:
-                product_info = extract_product_info_basic(element)
+                product_info = extract_product_info_basic(element, winners, scraped_at)
                 if product_info and product_info.get("product_url"):
                     product_info["rank"] = i + 1
                     results.append(product_info)
-                    print(f"Extracted product {i+1}: {product_info.get('product_name', 'Unknown')[:50]}...")
+                    logger.debug("Extracted product %d: %.50s...", i + 1, product_info["product_name"])
             except Exception as e:
-                print(f"Error extracting product {i+1}: {e}")
+                logger.warning("Error extracting product %d: %s", i + 1, e)
                 continue
         
         return results
         
     except Exception as e:
-        print(f"Error in search_products_basic: {e}")
+        logger.error("Error in search_products_basic: %s", e)
         return []
 
-def extract_product_info_basic(element) -> Optional[Dict[str, Any]]:
-    """Extract product information from HTML element using basic parsing."""
+def _text(value: Any) -> str:
+    """JSON field as display text; missing values become empty strings."""
+    return "" if value is None else str(value).strip()
+
+def parse_page_data(html: bytes, max_results: int = 10,
+                    scraped_at: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+    """Read search results from the ``window.pageData`` JSON Daraz embeds in listings.
+    
+    Returns None when the page has no usable payload, or none of its items
+    has a product URL, so callers can fall back to scraping the rendered cards.
+    """
+    match = _PAGE_DATA_RE.search(html)
+    if not match:
+        return None
     try:
-        product_info = {
-            "product_name": "",
-            "price": "",
-            "original_price": "",
-            "discount": "",
-            "rating": "",
-            "review_count": "",
-            "seller_name": "",
-            "seller_location": "",
-            "brand": "",
-            "availability": "",
-            "product_url": "",
-            "rank": 0,
-            "scraped_at": time.strftime("%Y-%m-%d %H:%M:%S")
-        }
+        items = orjson.loads(match.group(1))["mods"]["listItems"]
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        return None
+    if not isinstance(items, list):
+        return None
+    
+    scraped_at = scraped_at or time.strftime(TIMESTAMP_FORMAT)
+    results = []
+    for i, item in enumerate(items[:max_results]):
+        if not isinstance(item, dict):
+            continue
+        product_url = _text(item.get("productUrl") or item.get("itemUrl"))
+        if not product_url:
+            continue
+        if product_url.startswith('//'):
+            product_url = 'https:' + product_url
+        elif product_url.startswith('/'):
+            product_url = BASE_URL + product_url
+        results.append({
+            **_EMPTY_PRODUCT,
+            "product_name": _text(item.get("name")),
+            "price": _text(item.get("priceShow") or item.get("price")),
+            "original_price": _text(item.get("originalPriceShow") or item.get("originalPrice")),
+            "discount": _text(item.get("discount")),
+            "rating": _text(item.get("ratingScore")),
+            "review_count": _text(item.get("review")),
+            "seller_name": _text(item.get("sellerName")),
+            "seller_location": _text(item.get("location")),
+            "brand": _text(item.get("brandName")),
+            "product_url": product_url,
+            "rank": i + 1,
+            "scraped_at": scraped_at,
+        })
+    return results or None
+
+def _is_price(text: str) -> bool:
+    """Price text must mention a currency or contain a digit."""
+    return bool(text) and ('Rs.' in text or '₹' in text or bool(_HAS_DIGIT(text)))
+
+def _match_field(element, field: str, selectors, accept, winners: Optional[Dict[str, str]]) -> str:
+    """Return the first accepted text for ``field``, trying the last winning selector first."""
+    winner = winners.get(field) if winners is not None else None
+    if winner:
+        for elem in element.css(winner):
+            text = elem.text(strip=True)
+            if accept(text):
+                return text
+    
+    for selector in selectors:
+        if selector == winner:
+            continue
+        for elem in element.css(selector):
+            text = elem.text(strip=True)
+            if accept(text):
+                if winners is not None:
+                    winners[field] = selector
+                return text
+    return ""
+
+def extract_product_info_basic(element, winners: Optional[Dict[str, str]] = None,
+                               scraped_at: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Extract product information from HTML element using basic parsing.
+    
+    ``winners`` maps each field to the selector that last matched it and is
+    updated in place, so it can be shared across the cards of one page.
+    ``scraped_at`` defaults to the current time.
+    """
+    try:
+        product_info = _EMPTY_PRODUCT.copy()
+        product_info["scraped_at"] = scraped_at or time.strftime(TIMESTAMP_FORMAT)
         
         # Extract product URL
-        link = element.find('a', href=re.compile(r'/products/'))
+        link = element.css_first("a[href*='/products/']")
         if link:
-            product_url = link.get('href')
+            product_url = link.attributes.get('href')
             if product_url:
                 if product_url.startswith('//'):
                     product_url = 'https:' + product_url
@@ -150,116 +384,122 @@ def extract_product_info_basic(element) -> Optional[Dict[str, Any]]:
                 product_info["product_url"] = product_url
         
         # Extract product name
-        name_selectors = [
-            'div[class*="title"]',
-            'div[class*="name"]',
-            'h3', 'h4', 'h5',
-            'span[class*="title"]',
-            'span[class*="name"]',
-            'a[class*="title"]'
-        ]
-        
-        for selector in name_selectors:
-            name_elem = element.select_one(selector)
-            if name_elem and name_elem.get_text(strip=True):
-                product_info["product_name"] = name_elem.get_text(strip=True)
-                break
+        product_info["product_name"] = _match_field(element, "name", _CARD_NAME_SELECTORS, bool, winners)
         
         # Extract price
-        price_selectors = [
-            'span[class*="price"]',
-            'div[class*="price"]',
-            'span[class*="currency"]',
-            'div[class*="currency"]'
-        ]
-        
-        for selector in price_selectors:
-            price_elem = element.select_one(selector)
-            if price_elem:
-                price_text = price_elem.get_text(strip=True)
-                if price_text and ('Rs.' in price_text or '₹' in price_text or re.search(r'\d+', price_text)):
-                    product_info["price"] = price_text
-                    break
+        product_info["price"] = _match_field(element, "price", _CARD_PRICE_SELECTORS, _is_price, winners)
         
         # Extract rating
-        rating_elem = element.select_one('span[class*="rating"], div[class*="rating"]')
+        rating_elem = element.css_first(_CARD_RATING_SELECTOR)
         if rating_elem:
-            product_info["rating"] = rating_elem.get_text(strip=True)
+            product_info["rating"] = rating_elem.text(strip=True)
         
         # Extract review count
-        review_elem = element.select_one('span[class*="review"], div[class*="review"]')
+        review_elem = element.css_first(_CARD_REVIEW_SELECTOR)
         if review_elem:
-            product_info["review_count"] = review_elem.get_text(strip=True)
+            product_info["review_count"] = review_elem.text(strip=True)
         
         return product_info
         
     except Exception as e:
-        print(f"Error extracting product info: {e}")
+        logger.warning("Error extracting product info: %s", e)
+        return None
+
+def _scrape_product_page(url: str, rank: int, scraped_at: str) -> Optional[Dict[str, Any]]:
+    """Fetch and parse one product page; returns None if it could not be scraped."""
+    try:
+        tree = LexborHTMLParser(_fetch_page(url, 15))
+        
+        product_info = {**_EMPTY_PRODUCT, "product_url": url, "rank": rank, "scraped_at": scraped_at}
+        
+        # Extract product name
+        name_elem = tree.css_first(_PAGE_NAME_SELECTOR)
+        if name_elem:
+            product_info["product_name"] = name_elem.text(strip=True)
+        
+        # Extract price
+        price_elem = tree.css_first(_PAGE_PRICE_SELECTOR)
+        if price_elem:
+            product_info["price"] = price_elem.text(strip=True)
+        
+        # Extract seller name
+        seller_elem = tree.css_first(_PAGE_SELLER_SELECTOR)
+        if seller_elem:
+            product_info["seller_name"] = seller_elem.text(strip=True)
+        
+        logger.debug("Extracted product %d: %.50s...", rank, product_info["product_name"])
+        return product_info
+        
+    except Exception as e:
+        logger.warning("Error scraping product %d: %s", rank, e)
         return None
 
 def get_products_from_urls_basic(product_urls: List[str]) -> List[Dict[str, Any]]:
-    """Get product information from URLs using basic HTTP requests."""
-    results = []
+    """Get product information from URLs using basic HTTP requests.
     
-    for i, url in enumerate(product_urls):
-        try:
-            print(f"Scraping product {i+1}/{len(product_urls)}: {url}")
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-            }
-            
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            product_info = {
-                "product_name": "",
-                "price": "",
-                "original_price": "",
-                "discount": "",
-                "rating": "",
-                "review_count": "",
-                "seller_name": "",
-                "seller_location": "",
-                "brand": "",
-                "availability": "",
-                "product_url": url,
-                "rank": i + 1,
-                "scraped_at": time.strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            # Extract product name
-            name_elem = soup.select_one('h1[class*="product-name"], h1[class*="title"], h1')
-            if name_elem:
-                product_info["product_name"] = name_elem.get_text(strip=True)
-            
-            # Extract price
-            price_elem = soup.select_one('span[class*="price"], div[class*="price"]')
-            if price_elem:
-                product_info["price"] = price_elem.get_text(strip=True)
-            
-            # Extract seller name
-            seller_elem = soup.select_one('div.seller-name__detail a.seller-name__detail-name, a[class*="seller"], div[class*="seller"]')
-            if seller_elem:
-                product_info["seller_name"] = seller_elem.get_text(strip=True)
-            
-            results.append(product_info)
-            print(f"Extracted product {i+1}: {product_info.get('product_name', 'Unknown')[:50]}...")
-            
-            # Small delay to be respectful
-            time.sleep(0.5)
-            
-        except Exception as e:
-            print(f"Error scraping product {i+1}: {e}")
-            continue
+    Pages are fetched concurrently over the shared session; results keep the
+    order of ``product_urls``.
+    """
+    if not product_urls:
+        return []
+    
+    logger.info("Scraping %d products", len(product_urls))
+    scraped_at = time.strftime(TIMESTAMP_FORMAT)
+    pages = _DETAIL_POOL.map(_scrape_product_page, product_urls, range(1, len(product_urls) + 1),
+                             repeat(scraped_at))
+    return [page for page in pages if page is not None]
+
+def _get_driver():
+    """Return the shared headless Chrome driver, starting it on first use.
     
-    return results
+    Callers must hold ``_DRIVER_LOCK`` for as long as they use the driver.
+    """
+    global _DRIVER
+    if _DRIVER is not None:
+        return _DRIVER
+    
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from webdriver_manager.chrome import ChromeDriverManager
+    from selenium.webdriver.chrome.service import Service
+    
+    # Set up Chrome options for cloud environment
+    chrome_options = Options()
+    chrome_options.add_argument('--headless')  # Run in headless mode
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument('--disable-extensions')
+    chrome_options.add_argument('--disable-plugins')
+    # Images are never read; the product grid needs JavaScript, so it stays on
+    chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    # Return from driver.get at DOMContentLoaded; the waits below poll for the grid
+    chrome_options.page_load_strategy = 'eager'
+    
+    service = Service(ChromeDriverManager().install())
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    logger.info("Chrome driver created successfully")
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(_SELENIUM_BLOCKED_URLS)})
+    except Exception as e:
+        logger.warning("Could not block subresources: %s", e)
+    
+    _DRIVER = driver
+    return driver
+
+def _quit_driver() -> None:
+    """Shut down the shared driver, if any; the next search starts a fresh one."""
+    global _DRIVER
+    driver, _DRIVER = _DRIVER, None
+    if driver is not None:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+atexit.register(_quit_driver)
 
 def search_products_selenium_cloud(query: str, max_results: int = 10) -> List[Dict[str, Any]]:
     """
@@ -268,165 +508,88 @@ def search_products_selenium_cloud(query: str, max_results: int = 10) -> List[Di
     """
     try:
         # Try to import Selenium components
-        from selenium import webdriver
         from selenium.webdriver.common.by import By
         from selenium.webdriver.support.ui import WebDriverWait
         from selenium.webdriver.support import expected_conditions as EC
-        from selenium.webdriver.chrome.options import Options
-        from selenium.common.exceptions import WebDriverException, TimeoutException
-        from webdriver_manager.chrome import ChromeDriverManager
-        from selenium.webdriver.chrome.service import Service
+        from selenium.common.exceptions import TimeoutException
         
-        # Set up Chrome options for cloud environment
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')  # Run in headless mode
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--disable-extensions')
-        chrome_options.add_argument('--disable-plugins')
-        chrome_options.add_argument('--disable-images')
-        chrome_options.add_argument('--disable-javascript')  # Try without JS first
-        
-        try:
-            # Try to create Chrome driver
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-            print("Chrome driver created successfully")
-        except Exception as e:
-            print(f"Failed to create Chrome driver: {e}")
-            return []
-        
-        try:
-            # Construct search URL
-            search_url = f"{BASE_URL}/catalog/?q={urlencode({'q': query})[2:]}"
-            print(f"Loading search page: {search_url}")
-            
-            driver.get(search_url)
-            time.sleep(3)  # Wait for page to load
-            
-            # Wait for product elements
-            wait = WebDriverWait(driver, 10)
-            
-            # Try to find product elements
-            product_selectors = [
-                "div[data-qa-locator='product-item']",
-                "div[class*='product-item']",
-                "div[class*='ProductItem']",
-                "div[class*='product-card']"
-            ]
-            
-            product_elements = []
-            for selector in product_selectors:
-                try:
-                    elements = wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, selector)))
-                    if elements:
-                        product_elements = elements
-                        print(f"Found {len(elements)} products using selector: {selector}")
-                        break
-                except TimeoutException:
-                    continue
-            
-            if not product_elements:
-                print("No product elements found with Selenium")
+        # One browser serves every search, one search at a time
+        with _DRIVER_LOCK:
+            try:
+                driver = _get_driver()
+            except ImportError:
+                raise
+            except Exception as e:
+                logger.error("Failed to create Chrome driver: %s", e)
                 return []
             
-            # Extract product information
-            results = []
-            for i, element in enumerate(product_elements[:max_results]):
+            try:
+                # Construct search URL
+                search_url = SEARCH_URL_PREFIX + quote_plus(query)
+                logger.info("Loading search page: %s", search_url)
+                
+                driver.get(search_url)
+                
+                # Wait for product elements
+                wait = WebDriverWait(driver, 10)
+                
+                # Try to find product elements
+                card_selector = None
+                for selector in _SELENIUM_CARD_SELECTORS:
+                    try:
+                        elements = wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, selector)))
+                        if elements:
+                            card_selector = selector
+                            logger.info("Found %d products using selector: %s", len(elements), selector)
+                            break
+                    except TimeoutException:
+                        continue
+                
+                if not card_selector:
+                    logger.info("No product elements found with Selenium")
+                    return []
+                
+                # Extract every card in one script call instead of several driver
+                # round-trips per product
+                cards = driver.execute_script(
+                    _SELENIUM_EXTRACT_JS,
+                    card_selector,
+                    max_results,
+                    list(_SELENIUM_NAME_SELECTORS),
+                    list(_SELENIUM_PRICE_SELECTORS),
+                    _CARD_RATING_SELECTOR,
+                )
+                
+                results = []
+                scraped_at = time.strftime(TIMESTAMP_FORMAT)
+                for i, card in enumerate(cards):
+                    if not card["url"]:
+                        continue
+                    product_info = {
+                        **_EMPTY_PRODUCT,
+                        "product_name": card["name"],
+                        "price": card["price"],
+                        "rating": card["rating"],
+                        "product_url": card["url"],
+                        "rank": i + 1,
+                        "scraped_at": scraped_at,
+                    }
+                    results.append(product_info)
+                    logger.debug("Extracted product %d: %.50s...", i + 1, product_info["product_name"])
+                
+                return results
+                
+            finally:
+                # Reset state for the next search; a browser that no longer
+                # responds is discarded and rebuilt on demand
                 try:
-                    product_info = extract_product_info_selenium_cloud(element, driver)
-                    if product_info and product_info.get("product_url"):
-                        product_info["rank"] = i + 1
-                        results.append(product_info)
-                        print(f"Extracted product {i+1}: {product_info.get('product_name', 'Unknown')[:50]}...")
-                except Exception as e:
-                    print(f"Error extracting product {i+1}: {e}")
-                    continue
-            
-            return results
-            
-        finally:
-            driver.quit()
+                    driver.delete_all_cookies()
+                except Exception:
+                    _quit_driver()
             
     except ImportError:
-        print("Selenium not available, skipping Selenium scraping")
+        logger.info("Selenium not available, skipping Selenium scraping")
         return []
     except Exception as e:
-        print(f"Error in search_products_selenium_cloud: {e}")
+        logger.error("Error in search_products_selenium_cloud: %s", e)
         return []
-
-def extract_product_info_selenium_cloud(element, driver) -> Optional[Dict[str, Any]]:
-    """Extract product information using Selenium with cloud optimizations."""
-    try:
-        product_info = {
-            "product_name": "",
-            "price": "",
-            "original_price": "",
-            "discount": "",
-            "rating": "",
-            "review_count": "",
-            "seller_name": "",
-            "seller_location": "",
-            "brand": "",
-            "availability": "",
-            "product_url": "",
-            "rank": 0,
-            "scraped_at": time.strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        # Extract product URL
-        try:
-            link = element.find_element(By.CSS_SELECTOR, "a[href*='/products/']")
-            product_url = link.get_attribute('href')
-            if product_url:
-                if product_url.startswith('//'):
-                    product_url = 'https:' + product_url
-                elif product_url.startswith('/'):
-                    product_url = BASE_URL + product_url
-                product_info["product_url"] = product_url
-        except:
-            pass
-        
-        # Extract product name
-        name_selectors = [
-            "div.RfADt",
-            "a[href*='/products/']",
-            "div[class*='title']",
-            "div[class*='name']",
-            "h3", "h4", "h5"
-        ]
-        
-        for selector in name_selectors:
-            try:
-                name_elem = element.find_element(By.CSS_SELECTOR, selector)
-                name_text = name_elem.text.strip()
-                if name_text:
-                    product_info["product_name"] = name_text
-                    break
-            except:
-                continue
-        
-        # Extract price
-        price_selectors = [
-            "span[class*='price']",
-            "div[class*='price']",
-            "span[class*='currency']"
-        ]
-        
-        for selector in price_selectors:
-            try:
-                price_elem = element.find_element(By.CSS_SELECTOR, selector)
-                price_text = price_elem.text.strip()
-                if price_text and ('Rs.' in price_text or re.search(r'\d+', price_text)):
-                    product_info["price"] = price_text
-                    break
-            except:
-                continue
-        
-        return product_info
-        
-    except Exception as e:
-        print(f"Error extracting product info: {e}")
-        return None
@@ -13,16 +13,30 @@ High-performance, memory-optimized Daraz scraper with:
 import asyncio
 import aiohttp
 import gc
-import weakref
-from typing import List, Dict, Any, AsyncGenerator, Optional
-from dataclasses import dataclass, asdict
-from contextlib import asynccontextmanager
+import os
+import sys
+from typing import List, Dict, Any, AsyncGenerator, Iterator, Optional, Union
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 import time
+import random
 import re
-from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+from operator import attrgetter, itemgetter
+from cachetools import TTLCache
+from yarl import URL
+from selectolax.lexbor import LexborHTMLParser as HTMLParser
 import logging
 
+try:
+    import uvloop  # libuv event loop; not available on Windows
+except ImportError:
+    uvloop = None
+
+try:
+    from zlib_ng import zlib_ng  # SIMD-accelerated zlib for gzip/deflate responses
+except ImportError:
+    zlib_ng = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,8 +44,27 @@ logger = logging.getLogger(__name__)
 # Base domain for Daraz Nepal
 BASE_URL = "https://www.daraz.com.np"
 
+CATALOG_URL = URL(BASE_URL) / "catalog/"
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# aiohttp decompresses responses with this backend; brotli is picked up on its own
+if zlib_ng is not None and hasattr(aiohttp, "set_zlib_backend"):
+    aiohttp.set_zlib_backend(zlib_ng)
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """Create an event loop for this module's users, using uvloop where it can run.
+    
+    Under gevent's monkey patching, loop threads are greenlets and uvloop's
+    C run loop never yields to the gevent hub, so the stdlib loop is used.
+    """
+    monkey = sys.modules.get("gevent.monkey")
+    if uvloop is None or (monkey is not None and monkey.is_module_patched("threading")):
+        return asyncio.new_event_loop()
+    return uvloop.new_event_loop()
+
 # Memory-optimized data structure
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ProductData:
     """Immutable, memory-efficient product data structure"""
     product_name: str
@@ -44,13 +77,33 @@ class ProductData:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary only when needed"""
-        return asdict(self)
+        return {
+            "product_name": self.product_name,
+            "price": self.price,
+            "seller_name": self.seller_name,
+            "seller_location": self.seller_location,
+            "product_url": self.product_url,
+            "rank": self.rank,
+            "scraped_at": self.scraped_at,
+        }
 
 # Connection pool configuration
 CONNECTOR_LIMIT = 100  # Max concurrent connections
 CONNECTOR_LIMIT_PER_HOST = 30  # Max connections per host
 TIMEOUT = aiohttp.ClientTimeout(total=30, connect=10)
 
+# Statuses worth retrying among 4xx/5xx; other 4xx fail immediately
+RETRY_STATUSES = frozenset((429, 503))
+MAX_BACKOFF = 30  # seconds
+
+# Parser threads; selectolax releases the GIL while building the tree
+PARSE_WORKERS = min(4, os.cpu_count() or 1)
+_PARSE_POOL = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="daraz-opt-parse")
+
+# Product detail cache bounds
+DETAILS_CACHE_SIZE = 2048
+DETAILS_CACHE_TTL = 3600  # seconds
+
 # Headers for requests
 HEADERS = {
     "User-Agent": (
@@ -64,16 +117,62 @@ HEADERS = {
     "Upgrade-Insecure-Requests": "1",
 }
 
+# Selectors and patterns used by the parsers, compiled once at import
+_PRODUCT_CARD_SELECTOR = "div[data-qa-locator='product-item']"
+_PRODUCT_LINK_SELECTOR = 'a[href*="/products/"]'
+_CARD_PRICE_SELECTOR = 'span.ooOxS, div[class*="price"]'
+_SELLER_SELECTOR = 'div.seller-name__detail a.seller-name__detail-name'
+_LOCATION_SELECTOR = 'div.seller-name__detail .seller-info-location, div[class*="seller"] [class*="location"]'
+_SELLER_BLOCK_SELECTOR = 'div.pdp-seller, footer'
+
+# Product page name and price, tried in order
+_NAME_SELECTORS = (
+    'h1[class*="pdp-product-name"]',
+    'h1[class*="product-name"]',
+    'h1[class*="title"]',
+    'h1',
+)
+_PRICE_SELECTORS = (
+    'span[class*="pdp-price"]',
+    'span[class*="current-price"]',
+    'span[class*="price-current"]',
+    'div[class*="price-current"]',
+)
+
+_PRICE_RE = re.compile(r'Rs\.\s*[\d,]+')
+
+# Seller location: a run of letters ending in a region keyword, within one text node
+_LOCATION_RE = re.compile(r'([A-Za-z ]+?(?:Province|District|City|Nepal))')
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds; HTTP dates are ignored"""
+    if value and value.strip().isdigit():
+        return float(value)
+    return None
+
+
 class MemoryOptimizedScraper:
     """Memory-optimized scraper with connection pooling and async processing"""
     
-    def __init__(self, max_concurrent: int = 10):
+    def __init__(self, max_concurrent: int = 10, session: Optional[aiohttp.ClientSession] = None):
         self.max_concurrent = max_concurrent
-        self.session: Optional[aiohttp.ClientSession] = None
-        self._semaphore = asyncio.Semaphore(max_concurrent)
+        # A session passed in is shared and owned by the caller
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
+        # Created in start() so it belongs to the loop that runs the scraper
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Parsed detail pages by URL; failures are not cached
+        self._details_cache: TTLCache = TTLCache(maxsize=DETAILS_CACHE_SIZE, ttl=DETAILS_CACHE_TTL)
+        
+    async def start(self):
+        """Create the concurrency limit and open the pooled HTTP session unless one was provided"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        
+        if self.session is not None:
+            return
         
-    async def __aenter__(self):
-        """Async context manager entry"""
         connector = aiohttp.TCPConnector(
             limit=CONNECTOR_LIMIT,
             limit_per_host=CONNECTOR_LIMIT_PER_HOST,
@@ -87,56 +186,82 @@ class MemoryOptimizedScraper:
             headers=HEADERS,
             auto_decompress=True,
         )
+    
+    async def close(self):
+        """Close the pooled HTTP session if this scraper created it"""
+        if self.session and self._owns_session:
+            await self.session.close()
+            self.session = None
+    
+    async def __aenter__(self):
+        """Async context manager entry"""
+        await self.start()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        await self.close()
         
         # Force garbage collection
         gc.collect()
     
-    async def fetch_html(self, url: str, max_retries: int = 3) -> str:
+    async def fetch_html(self, url: Union[str, URL], max_retries: int = 3) -> bytes:
         """Fetch HTML with retry logic and memory optimization"""
         for attempt in range(max_retries):
+            retry_after = None
             try:
-                async with self._semaphore:  # Limit concurrent requests
-                    async with self.session.get(url) as response:
-                        if response.status == 200:
-                            # Stream the response to avoid loading everything into memory
-                            content = await response.text()
-                            return content
-                        else:
-                            response.raise_for_status()
+                # The scraper-wide limit is held per product by the caller; the
+                # connector's limit_per_host caps connections to each host
+                async with self.session.get(url) as response:
+                    if response.status == 200:
+                        # Raw bytes, parsed as UTF-8 (what daraz.com.np serves); selectolax does no charset sniffing
+                        return await response.read()
+                    if response.status in RETRY_STATUSES:
+                        retry_after = _retry_after_seconds(response.headers.get("Retry-After"))
+                    response.raise_for_status()
                             
             except Exception as e:
-                if attempt == max_retries - 1:
-                    logger.error(f"Failed to fetch {url} after {max_retries} attempts: {e}")
+                # Client errors other than throttling won't succeed on retry
+                give_up = attempt == max_retries - 1 or (
+                    isinstance(e, aiohttp.ClientResponseError)
+                    and e.status < 500
+                    and e.status not in RETRY_STATUSES
+                )
+                if give_up:
+                    logger.error(f"Failed to fetch {url} after {attempt + 1} attempts: {e}")
                     raise
-                
-                # Exponential backoff
-                await asyncio.sleep(2 ** attempt)
+            
+            # Honour Retry-After, otherwise back off with jitter so clients don't sync up
+            if retry_after is None:
+                retry_after = (2 ** attempt) * (0.5 + random.random())
+            await asyncio.sleep(min(MAX_BACKOFF, retry_after))
         
         raise RuntimeError(f"Failed to fetch {url}")
     
-    def parse_search_results(self, html: str) -> List[Dict[str, str]]:
-        """Parse search results with memory-efficient approach"""
-        soup = BeautifulSoup(html, "html.parser")
-        products = []
+    def parse_search_results(
+        self, html: Union[str, bytes], limit: Optional[int] = None
+    ) -> List[Dict[str, str]]:
+        """Parse product cards on a search page, up to limit if given"""
+        return list(self.iter_search_results(html, limit))
+    
+    def iter_search_results(
+        self, html: Union[str, bytes], limit: Optional[int] = None
+    ) -> Iterator[Dict[str, str]]:
+        """Yield product summaries, extracting no more cards than needed for limit"""
+        if limit is not None and limit <= 0:
+            return
         
-        # Use generator to avoid loading all elements into memory at once
-        product_cards = soup.select("div[data-qa-locator='product-item']")
+        tree = HTMLParser(html)
+        count = 0
         
-        for card in product_cards:
+        for card in tree.css(_PRODUCT_CARD_SELECTOR):
             try:
                 # Extract only essential data
-                link = card.find('a', href=re.compile(r'/products/'))
+                link = card.css_first(_PRODUCT_LINK_SELECTOR)
                 if not link:
                     continue
                 
-                href = link.get('href', '')
+                href = link.attributes.get('href') or ''
                 if not href:
                     continue
                 
@@ -151,57 +276,74 @@ class MemoryOptimizedScraper:
                     product_url = BASE_URL + '/' + href
                 
                 # Extract product name efficiently
-                product_name = self._extract_product_name(card)
+                product_name = self._extract_product_name(card, link)
                 if not product_name:
                     continue
                 
                 # Extract price efficiently
                 price = self._extract_price(card)
                 
-                products.append({
+                summary = {
                     "name": product_name,
                     "price": price or "Price not available",
                     "url": product_url
-                })
+                }
                 
             except Exception as e:
                 logger.warning(f"Error parsing product card: {e}")
                 continue
-        
-        return products
+            
+            yield summary
+            count += 1
+            if count == limit:
+                return
     
-    def _extract_product_name(self, card) -> str:
+    def _extract_product_name(self, card, link) -> str:
         """Extract product name efficiently"""
         # Try specific selector first
-        name_elem = card.select_one("div.RfADt")
+        name_elem = card.css_first("div.RfADt")
         if name_elem:
-            text = name_elem.get_text(strip=True)
-            if text:
-                lines = text.split('\n')
-                clean_name = lines[0].strip()
-                if clean_name and len(clean_name) > 3 and not clean_name.startswith('Rs.'):
-                    return clean_name
+            clean_name = name_elem.text(strip=True).partition('\n')[0].strip()
+            if len(clean_name) > 3 and clean_name[:3] != 'Rs.':
+                return clean_name
         
-        # Fallback to link text
-        link = card.find('a', href=re.compile(r'/products/'))
-        if link:
-            text = link.get_text(strip=True)
-            if text and len(text) > 3:
-                return text
+        # Fallback to text of the product link the caller already found
+        text = link.text(strip=True)
+        if len(text) > 3:
+            return text
         
         return ""
     
     def _extract_price(self, card) -> str:
-        """Extract price efficiently using regex"""
-        all_text = card.get_text()
-        price_match = re.search(r'Rs\.\s*[\d,]+', all_text)
+        """Extract price from the price node, scanning the whole card only on a miss"""
+        price_elem = card.css_first(_CARD_PRICE_SELECTOR)
+        if price_elem:
+            price_match = _PRICE_RE.search(price_elem.text())
+            if price_match:
+                return price_match.group()
+        price_match = _PRICE_RE.search(card.text())
         return price_match.group() if price_match else ""
     
-    async def get_product_details(self, product_url: str) -> Dict[str, Any]:
+    async def get_product_details(
+        self, product_url: str, scraped_at: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Get product details with memory optimization"""
+        if scraped_at is None:
+            scraped_at = time.strftime(TIMESTAMP_FORMAT)
+        
+        # Queries in a batch often surface the same products
+        cached = self._details_cache.get(product_url)
+        if cached is not None:
+            return {**cached, "scraped_at": scraped_at}
+        
         try:
             html = await self.fetch_html(product_url)
-            return self.parse_product_details(html, product_url)
+            # Parse off the event loop so other fetches keep progressing
+            details = await asyncio.get_running_loop().run_in_executor(
+                _PARSE_POOL, self.parse_product_details, html, product_url, scraped_at
+            )
+            self._details_cache[product_url] = details
+            return details
         except Exception as e:
             logger.error(f"Error getting product details for {product_url}: {e}")
             return {
@@ -211,13 +353,17 @@ class MemoryOptimizedScraper:
                 "seller_location": "",
                 "product_url": product_url,
                 "rank": 0,
-                "scraped_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "scraped_at": scraped_at,
                 "error": str(e)
             }
     
-    def parse_product_details(self, html: str, product_url: str) -> Dict[str, Any]:
+    def parse_product_details(
+        self, html: Union[str, bytes], product_url: str, scraped_at: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Parse product details with memory optimization"""
-        soup = BeautifulSoup(html, "html.parser")
+        tree = HTMLParser(html)
+        if scraped_at is None:
+            scraped_at = time.strftime(TIMESTAMP_FORMAT)
         
         # Initialize with minimal data
         product_details = {
@@ -227,59 +373,41 @@ class MemoryOptimizedScraper:
             "seller_location": "",
             "product_url": product_url,
             "rank": 0,
-            "scraped_at": time.strftime("%Y-%m-%d %H:%M:%S")
+            "scraped_at": scraped_at
         }
         
         try:
             # Extract product name
-            name_selectors = [
-                'h1[class*="pdp-product-name"]',
-                'h1[class*="product-name"]',
-                'h1[class*="title"]',
-                'h1'
-            ]
-            
-            for selector in name_selectors:
-                name_elem = soup.select_one(selector)
+            for selector in _NAME_SELECTORS:
+                name_elem = tree.css_first(selector)
                 if name_elem:
-                    product_details["product_name"] = name_elem.get_text(strip=True)
+                    product_details["product_name"] = name_elem.text(strip=True)
                     break
             
             # Extract price
-            price_selectors = [
-                'span[class*="pdp-price"]',
-                'span[class*="current-price"]',
-                'span[class*="price-current"]',
-                'div[class*="price-current"]'
-            ]
-            
-            for selector in price_selectors:
-                price_elem = soup.select_one(selector)
+            for selector in _PRICE_SELECTORS:
+                price_elem = tree.css_first(selector)
                 if price_elem:
-                    product_details["price"] = price_elem.get_text(strip=True)
+                    product_details["price"] = price_elem.text(strip=True)
                     break
             
             # Extract seller name using specific selector
-            seller_elem = soup.select_one('div.seller-name__detail a.seller-name__detail-name')
+            seller_elem = tree.css_first(_SELLER_SELECTOR)
             if seller_elem:
-                product_details["seller_name"] = seller_elem.get_text(strip=True)
-            
-            # Extract seller location
-            all_text = soup.get_text()
-            location_patterns = [
-                r'([A-Za-z\s]+Province)',
-                r'([A-Za-z\s]+District)',
-                r'([A-Za-z\s]+City)',
-                r'([A-Za-z\s]+Nepal)'
-            ]
+                product_details["seller_name"] = seller_elem.text(strip=True)
             
-            for pattern in location_patterns:
-                location_match = re.search(pattern, all_text)
-                if location_match:
-                    location = location_match.group(1).strip()
-                    if location and len(location) > 3:
-                        product_details["seller_location"] = location
-                        break
+            # Extract seller location from its node, else regex over the seller block only
+            location_elem = tree.css_first(_LOCATION_SELECTOR)
+            if location_elem:
+                product_details["seller_location"] = location_elem.text(strip=True)
+            else:
+                seller_block = tree.css_first(_SELLER_BLOCK_SELECTOR)
+                if seller_block:
+                    for location_match in _LOCATION_RE.finditer(seller_block.text(separator="\n")):
+                        location = location_match.group(1).strip()
+                        if len(location) > 3:
+                            product_details["seller_location"] = location
+                            break
             
         except Exception as e:
             logger.error(f"Error parsing product details: {e}")
@@ -294,43 +422,36 @@ class MemoryOptimizedScraper:
         """Stream products as they are processed to avoid memory buildup"""
         
         # Build search URL
-        encoded_query = aiohttp.helpers.quote(query)
-        search_url = f"{BASE_URL}/catalog/?q={encoded_query}"
+        search_url = CATALOG_URL.with_query(q=query)
         
         try:
             # Fetch search results
             search_html = await self.fetch_html(search_url)
-            product_summaries = self.parse_search_results(search_html)
+            product_summaries = await asyncio.get_running_loop().run_in_executor(
+                _PARSE_POOL, self.parse_search_results, search_html, max_results
+            )
             
             if not product_summaries:
                 logger.warning(f"No products found for query: {query}")
                 return
             
-            # Limit results
-            product_summaries = product_summaries[:max_results]
-            
-            # Process products concurrently with streaming
-            tasks = []
-            for i, summary in enumerate(product_summaries):
-                task = self._process_single_product(summary, i + 1)
-                tasks.append(task)
+            # Process products concurrently with streaming; one timestamp per search
+            scraped_at = time.strftime(TIMESTAMP_FORMAT)
+            tasks = [
+                asyncio.create_task(self._process_single_product(summary, i + 1, scraped_at))
+                for i, summary in enumerate(product_summaries)
+            ]
             
-            # Process in batches to control memory usage
-            batch_size = min(self.max_concurrent, len(tasks))
-            for i in range(0, len(tasks), batch_size):
-                batch = tasks[i:i + batch_size]
-                results = await asyncio.gather(*batch, return_exceptions=True)
-                
-                for result in results:
-                    if isinstance(result, Exception):
-                        logger.error(f"Error processing product: {result}")
-                        continue
-                    
+            # Yield each product as soon as it is ready; the semaphore bounds concurrency
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    result = await next_done
                     if result:
                         yield result
-                
-                # Force garbage collection after each batch
-                gc.collect()
+            finally:
+                # Don't leave work running if the consumer stops early
+                for task in tasks:
+                    task.cancel()
                 
         except Exception as e:
             logger.error(f"Error in search_products_streaming: {e}")
@@ -339,12 +460,14 @@ class MemoryOptimizedScraper:
     async def _process_single_product(
         self, 
         summary: Dict[str, str], 
-        rank: int
+        rank: int,
+        scraped_at: str
     ) -> Optional[ProductData]:
         """Process a single product with error handling"""
         try:
-            # Get detailed product information
-            detailed_info = await self.get_product_details(summary["url"])
+            # Get detailed product information, one permit per product
+            async with self._semaphore:
+                detailed_info = await self.get_product_details(summary["url"], scraped_at)
             
             # Create memory-efficient ProductData object
             product_data = ProductData(
@@ -354,7 +477,7 @@ class MemoryOptimizedScraper:
                 seller_location=detailed_info.get("seller_location", ""),
                 product_url=summary.get("url", ""),
                 rank=rank,
-                scraped_at=time.strftime("%Y-%m-%d %H:%M:%S")
+                scraped_at=scraped_at
             )
             
             return product_data
@@ -375,12 +498,12 @@ class MemoryOptimizedScraper:
                 products = []
                 async for product in self.search_products_streaming(query, max_results_per_query):
                     products.append(product)
+                products.sort(key=attrgetter("rank"))
                 
                 yield {query: products}
                 
                 # Clear the products list to free memory
                 products.clear()
-                gc.collect()
                 
             except Exception as e:
                 logger.error(f"Error processing query '{query}': {e}")
@@ -399,6 +522,7 @@ async def search_products_async(
         async for product in scraper.search_products_streaming(query, max_results):
             results.append(product.to_dict())
     
+    results.sort(key=itemgetter("rank"))
     return results
 
 def search_products_sync(
@@ -407,7 +531,8 @@ def search_products_sync(
     max_concurrent: int = 10
 ) -> List[Dict[str, Any]]:
     """Synchronous wrapper for async search function"""
-    return asyncio.run(search_products_async(query, max_results, max_concurrent))
+    with asyncio.Runner(loop_factory=new_event_loop) as runner:
+        return runner.run(search_products_async(query, max_results, max_concurrent))
 
 # Example usage and testing
 async def main():
@@ -432,4 +557,5 @@ async def main():
                 print(f"Query '{query}': {len(products)} products")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    with asyncio.Runner(loop_factory=new_event_loop) as runner:
+        runner.run(main())
@@ -12,24 +12,250 @@ comprehensive product information including name, price, seller details, ratings
 
 from __future__ import annotations
 
+import atexit
+import os
+import shutil
+import tempfile
+import threading
 import time
 import re
-from typing import List, Dict, Optional, Any
-from urllib.parse import urljoin, urlparse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, List, Dict, Optional, Any, Tuple
+from urllib.parse import quote, urljoin
 
+import requests
+from requests.adapters import HTTPAdapter
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+from selenium.common.exceptions import TimeoutException
+from selectolax.lexbor import LexborHTMLParser as HTMLParser
 
 # Base domain for Daraz Nepal
 BASE_URL = "https://www.daraz.com.np"
 
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Keep-alive session for product pages fetched without a browser
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"})
+# Enough pooled connections that parallel workers never open throwaway ones
+_SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+STATIC_TIMEOUT = 10  # seconds
+
+# Subresources that never affect extraction; scripts and XHR stay allowed
+# because Daraz renders its pages with JavaScript
+_BLOCKED_URLS = (
+    "*.png", "*.jpg", "*.jpeg", "*.webp", "*.gif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.mp4", "*.webm",
+    "*google-analytics*", "*googletagmanager*", "*doubleclick*", "*facebook*",
+)
+
+# Chrome profiles are throwaway, so keep them in RAM where tmpfs is available
+_PROFILE_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Pooled Chrome instances, and so product pages scraped at once
+SELENIUM_WORKERS = int(os.environ.get("SELENIUM_WORKERS", "4"))
+
+# Selector groups, each joined so one find_elements call covers the whole group
+_CARD_NAME_SELECTOR = ", ".join((
+    "div.RfADt",  # Specific class found in testing
+    "a[href*='/products/']",  # Product link often contains the name
+    "div[class*='title']",
+    "div[class*='name']",
+    "div[class*='product-name']",
+    "h3", "h4", "h5",
+    "span[class*='title']",
+    "span[class*='name']",
+    "a[class*='title']",
+))
+_CARD_PRICE_SELECTOR = ", ".join((
+    "span[class*='price']",
+    "div[class*='price']",
+    "span[class*='currency']",
+    "div[class*='currency']",
+    "span[class*='amount']",
+))
+_CARD_RATING_SELECTOR = ", ".join((
+    "span[class*='rating']",
+    "div[class*='rating']",
+    "span[class*='score']",
+    "div[class*='score']",
+))
+_CARD_REVIEW_SELECTOR = ", ".join((
+    "span[class*='review']",
+    "div[class*='review']",
+    "span[class*='comment']",
+    "div[class*='comment']",
+))
+
+# Reads url/name/price/rating/reviews from the first N cards with distinct product
+# links, in one round-trip. Arguments: card selector, limit, then the name,
+# price, rating and review groups
+_LISTING_EXTRACT_JS = """
+const [cardSelector, limit, nameSelector, priceSelector, ratingSelector, reviewSelector] = arguments;
+const hasDigit = t => /\\d/.test(t);
+const firstText = (card, selector, accept) => {
+    for (const el of card.querySelectorAll(selector)) {
+        const text = el.innerText.trim();
+        if (text && accept(text)) return text;
+    }
+    return '';
+};
+// First line of the first candidate that looks like a name rather than a price
+const cardName = card => {
+    for (const el of card.querySelectorAll(nameSelector)) {
+        const line = el.innerText.trim().split('\\n')[0].trim();
+        if (line.length > 3 && !line.startsWith('Rs.')) return line;
+    }
+    return '';
+};
+const out = [];
+const seen = new Set();
+for (const card of document.querySelectorAll(cardSelector)) {
+    if (out.length >= limit) break;
+    const link = card.querySelector("a[href*='/products/']");
+    if (!link || !link.href || seen.has(link.href)) continue;
+    seen.add(link.href);
+    const price = card.innerText.match(/Rs\\.\\s*[\\d,]+/);
+    out.push({
+        product_url: link.href,
+        product_name: cardName(card),
+        price: price ? price[0] : firstText(card, priceSelector, hasDigit),
+        rating: firstText(card, ratingSelector, hasDigit),
+        review_count: firstText(card, reviewSelector, hasDigit),
+    });
+}
+return out;
+"""
+
+# Product page is ready to read once either of these exists
+_PDP_READY_SELECTOR = "h1, span[class*='pdp-price']"
+PDP_WAIT_TIMEOUT = 5  # seconds
+
+# Product page selectors, tried in order by _fetch_static and, inside the
+# browser, by _PDP_EXTRACT_JS
+_PDP_NAME_SELECTORS = (
+    "h1[class*='pdp-product-name']",
+    "h1[class*='product-name']",
+    "h1[class*='title']",
+    "h1",
+    "span[class*='pdp-product-name']",
+    "div[class*='product-name']",
+)
+_PDP_PRICE_SELECTORS = (
+    "span[class*='pdp-price']",
+    "span[class*='current-price']",
+    "span[class*='price-current']",
+    "div[class*='price-current']",
+    "span[class*='currency']",
+)
+_PDP_SELLER_SELECTORS = (
+    "div.seller-name__detail a.seller-name__detail-name",
+    "a[class*='seller']",
+    "div[class*='seller']",
+    "span[class*='seller']",
+    "a[href*='seller']",
+)
+_PDP_BRAND_SELECTORS = (
+    "span[class*='brand']",
+    "div[class*='brand']",
+    "a[class*='brand']",
+)
+_PDP_AVAILABILITY_SELECTORS = (
+    "span[class*='stock']",
+    "div[class*='stock']",
+    "span[class*='availability']",
+    "div[class*='availability']",
+)
+
+# Reads every product page field in one round-trip. Argument: an object mapping
+# field name to its selector list; each field takes the first non-empty match
+_PDP_EXTRACT_JS = """
+const fields = arguments[0];
+const out = {};
+for (const [field, selectors] of Object.entries(fields)) {
+    out[field] = '';
+    for (const sel of selectors) {
+        const el = document.querySelector(sel);
+        const text = el ? el.innerText.trim() : '';
+        if (text) { out[field] = text; break; }
+    }
+}
+return out;
+"""
+_PDP_FIELDS = {
+    "product_name": list(_PDP_NAME_SELECTORS),
+    "price": list(_PDP_PRICE_SELECTORS),
+    "seller_name": list(_PDP_SELLER_SELECTORS),
+    "brand": list(_PDP_BRAND_SELECTORS),
+    "availability": list(_PDP_AVAILABILITY_SELECTORS),
+}
+
+
+_PRICE_RE = re.compile(r'Rs\.\s*[\d,]+')
+
+# Seller location candidates, most specific first
+_LOCATION_RES = tuple(re.compile(p) for p in (
+    r'([A-Za-z\s]+Province)',
+    r'([A-Za-z\s]+District)',
+    r'([A-Za-z\s]+City)',
+    r'([A-Za-z\s]+Nepal)',
+))
+
+
+def _first_text(nodes, needs_digit: bool = False) -> str:
+    """Return the stripped text of the first node with usable text.
+    
+    Args:
+        nodes: Parsed HTML nodes in document order.
+        needs_digit: Skip texts that contain no digit.
+        
+    Returns:
+        The text, or an empty string if no node qualifies.
+    """
+    for node in nodes:
+        text = node.text(separator="\n").strip()
+        if text and (not needs_digit or any(char.isdigit() for char in text)):
+            return text
+    return ""
+
+
+def _empty_product_info(product_url: str) -> Dict[str, Any]:
+    """Return a product record with every field empty except the URL."""
+    return {
+        "product_name": "",
+        "price": "",
+        "original_price": "",
+        "discount": "",
+        "rating": "",
+        "review_count": "",
+        "seller_name": "",
+        "seller_location": "",
+        "brand": "",
+        "availability": "",
+        "product_url": product_url,
+        "rank": 0,  # Will be set by caller
+        "scraped_at": time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+
+class _ProfileChrome(webdriver.Chrome):
+    """Chrome WebDriver that deletes its temporary profile directory on quit."""
+    
+    def __init__(self, profile_dir: str, **kwargs):
+        self.profile_dir = profile_dir
+        super().__init__(**kwargs)
+    
+    def quit(self) -> None:
+        try:
+            super().quit()
+        finally:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+
 
 def create_driver(headless: bool = True) -> webdriver.Chrome:
     """Create and configure a Chrome WebDriver instance.
@@ -41,9 +267,11 @@ def create_driver(headless: bool = True) -> webdriver.Chrome:
         Configured Chrome WebDriver instance.
     """
     chrome_options = Options()
+    # get() returns at DOMContentLoaded; callers wait for the nodes they read
+    chrome_options.page_load_strategy = "eager"
     
     if headless:
-        chrome_options.add_argument("--headless")
+        chrome_options.add_argument("--headless=new")
     
     # Add various options to make the browser less detectable
     chrome_options.add_argument("--no-sandbox")
@@ -51,24 +279,163 @@ def create_driver(headless: bool = True) -> webdriver.Chrome:
     chrome_options.add_argument("--disable-blink-features=AutomationControlled")
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
-    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+    chrome_options.add_argument(f"--user-agent={USER_AGENT}")
+    
+    # Headless Chrome can ignore the image pref below; this stops images in Blink itself
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    
+    # Skip GPU, extensions and background services a scraping session never uses
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-background-networking")
+    chrome_options.add_argument("--disable-sync")
+    chrome_options.add_argument("--metrics-recording-only")
+    chrome_options.add_argument("--mute-audio")
+    chrome_options.add_argument("--disable-crash-reporter")
+    chrome_options.add_argument("--no-first-run")
+    chrome_options.add_argument("--no-default-browser-check")
+    chrome_options.add_argument("--disable-features=Translate,BackForwardCache")
+    
+    # Fresh profile per driver, on tmpfs when available; removed again by quit()
+    profile_dir = tempfile.mkdtemp(prefix=f"chrome-{os.getpid()}-", dir=_PROFILE_ROOT)
+    chrome_options.add_argument(f"--user-data-dir={profile_dir}")
     
-    # Disable images and CSS to speed up loading
+    # Disable images, CSS and other content the scraper never reads
     prefs = {
         "profile.managed_default_content_settings.images": 2,
-        "profile.managed_default_content_settings.stylesheets": 2
+        "profile.managed_default_content_settings.stylesheets": 2,
+        "profile.managed_default_content_settings.plugins": 2,
+        "profile.managed_default_content_settings.media_stream": 2,
+        "profile.managed_default_content_settings.notifications": 2,
     }
     chrome_options.add_experimental_option("prefs", prefs)
     
     try:
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        # Selenium Manager locates (and if needed downloads) a matching chromedriver
+        driver = _ProfileChrome(profile_dir, options=chrome_options)
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(_BLOCKED_URLS)})
+        except Exception as e:
+            print(f"Could not block subresources: {e}")
         return driver
     except Exception as e:
+        shutil.rmtree(profile_dir, ignore_errors=True)
         raise Exception(f"Failed to create WebDriver: {str(e)}")
 
 
+class DriverPool:
+    """Warm WebDrivers kept across searches, each used by one thread at a time.
+    
+    Drivers start on demand up to ``size`` and are reset when given back.
+    WebDriver instances are not thread-safe, so a driver handed out by
+    ``acquire`` belongs to the calling thread until it is returned.
+    """
+    
+    def __init__(self, size: int, headless: bool = True):
+        self.size = max(1, size)
+        self.headless = headless
+        self._idle: List[webdriver.Chrome] = []
+        self._started = 0
+        # Notified whenever a driver is returned or a slot to start one frees up
+        self._available = threading.Condition()
+    
+    def _checkout(self) -> webdriver.Chrome:
+        with self._available:
+            while not self._idle and self._started >= self.size:
+                self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._started += 1
+        try:
+            return create_driver(self.headless)
+        except Exception:
+            self._release_slot()
+            raise
+    
+    def _release_slot(self) -> None:
+        with self._available:
+            self._started -= 1
+            self._available.notify()
+    
+    def _discard(self, driver: webdriver.Chrome) -> None:
+        self._release_slot()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    
+    @contextmanager
+    def acquire(self) -> Iterator[webdriver.Chrome]:
+        """Borrow a driver for the duration of the ``with`` block."""
+        driver = self._checkout()
+        try:
+            yield driver
+        finally:
+            try:
+                # Don't let one search's session leak into the next
+                driver.delete_all_cookies()
+                driver.get("about:blank")
+            except Exception:
+                # The browser died; a fresh one starts on the next acquire
+                self._discard(driver)
+            else:
+                with self._available:
+                    self._idle.append(driver)
+                    self._available.notify()
+    
+    def close(self) -> None:
+        """Quit every idle driver."""
+        with self._available:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._discard(driver)
+
+
+# One pool per headless setting, created by _get_pool() on first use
+_POOLS: Dict[bool, DriverPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _get_pool(headless: bool) -> DriverPool:
+    """Return the shared driver pool for the given headless setting."""
+    with _POOLS_LOCK:
+        pool = _POOLS.get(headless)
+        if pool is None:
+            pool = _POOLS[headless] = DriverPool(SELENIUM_WORKERS, headless)
+        return pool
+
+
+def _warmup(start_browser: bool = True) -> None:
+    """Prepare the scraper in a server process before it forks workers.
+    
+    Importing the module already compiles its regexes and selector strings.
+    Starting one throwaway browser also makes Selenium Manager resolve
+    chromedriver and pulls the Chrome binaries into the OS page cache, so
+    each worker's first driver starts warm. That browser is quit here, and
+    pools are left empty, because drivers must not be shared across forks.
+    
+    Args:
+        start_browser: Whether to launch and quit one headless browser.
+    """
+    if not start_browser:
+        return
+    try:
+        create_driver(headless=True).quit()
+    except Exception as e:
+        print(f"Selenium warmup failed: {e}")
+
+
+def _close_pools() -> None:
+    """Quit all pooled drivers on interpreter exit."""
+    for pool in list(_POOLS.values()):
+        pool.close()
+
+
+atexit.register(_close_pools)
+
+
 def search_products_selenium(query: str, *, max_results: int = 10, headless: bool = True) -> List[Dict[str, Any]]:
     """Search Daraz for a keyword using Selenium and return comprehensive product details.
     
@@ -80,112 +447,138 @@ def search_products_selenium(query: str, *, max_results: int = 10, headless: boo
     Returns:
         A list of dictionaries containing comprehensive product information.
     """
-    driver = None
     try:
-        # Create WebDriver
-        driver = create_driver(headless=headless)
+        pool = _get_pool(headless)
+        with pool.acquire() as driver:
+            listings = _collect_listings(driver, query, max_results)
         
-        # Build search URL
-        encoded_query = requests.utils.quote(query)
-        search_url = f"{BASE_URL}/catalog/?q={encoded_query}"
+        # Product pages are loaded in parallel, one driver per worker
+        return _scrape_products(pool, listings)
         
-        print(f"Loading search page: {search_url}")
-        driver.get(search_url)
-        
-        # Wait for page to load
-        wait = WebDriverWait(driver, 20)
+    except Exception as e:
+        print(f"Error in search_products_selenium: {str(e)}")
+        return [{"error": f"Search failed: {str(e)}"}]
+
+
+def _collect_listings(driver: webdriver.Chrome, query: str, max_results: int) -> List[Tuple[int, Dict[str, str]]]:
+    """Load the search page and return ``(rank, listing)`` pairs.
+    
+    Each listing holds what the search card itself shows: ``product_url``
+    and, when found, ``product_name``, ``price``, ``rating`` and ``review_count``.
+    
+    Args:
+        driver: WebDriver instance.
+        query: A free‑text search term.
+        max_results: Maximum number of products to return.
         
-        # Wait for product elements to appear
-        try:
-            # Try multiple possible selectors for product containers
-            product_selectors = [
-                "div[data-qa-locator='product-item']",
-                "div[class*='product-item']",
-                "div[class*='ProductItem']",
-                "div[class*='product-card']",
-                "div[class*='ProductCard']",
-                "div[class*='item']",
-                "div[class*='Item']"
-            ]
-            
-            product_elements = []
-            for selector in product_selectors:
-                try:
-                    elements = wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, selector)))
-                    if elements:
-                        product_elements = elements
-                        print(f"Found {len(elements)} products using selector: {selector}")
-                        break
-                except TimeoutException:
-                    continue
-            
-            if not product_elements:
-                # If no specific product containers found, look for any links to products
-                product_links = wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a[href*='/products/']")))
-                if product_links:
-                    print(f"Found {len(product_links)} product links")
-                    # Get unique product URLs
-                    product_urls = list(set([link.get_attribute('href') for link in product_links if link.get_attribute('href')]))
-                    return get_products_from_urls(product_urls[:max_results], driver)
-                else:
-                    return []
-            
-        except TimeoutException:
-            print("Timeout waiting for product elements to load")
-            return []
+    Returns:
+        Ranked listings, empty if the page shows no products.
+    """
+    # Build search URL
+    encoded_query = quote(query)
+    search_url = f"{BASE_URL}/catalog/?q={encoded_query}"
+    
+    print(f"Loading search page: {search_url}")
+    driver.get(search_url)
+    
+    # Wait for page to load
+    wait = WebDriverWait(driver, 20)
+    
+    # Wait for product elements to appear
+    try:
+        # Try multiple possible selectors for product containers, canonical locator first;
+        # if none match, the bare product links below are used instead
+        product_selectors = [
+            "div[data-qa-locator='product-item']",
+            "div[class*='product-item']",
+            "div[class*='ProductItem']",
+            "div[class*='product-card']",
+            "div[class*='ProductCard']",
+        ]
         
-        # Extract product information - collect URLs first to avoid stale elements
-        product_urls = []
-        for i, element in enumerate(product_elements[:max_results]):
+        card_selector = None
+        for selector in product_selectors:
             try:
-                # Extract URL first before any navigation
-                link = element.find_element(By.CSS_SELECTOR, "a[href*='/products/']")
-                product_url = link.get_attribute('href')
-                if product_url:
-                    if product_url.startswith('//'):
-                        product_url = 'https:' + product_url
-                    elif product_url.startswith('/'):
-                        product_url = BASE_URL + product_url
-                    product_urls.append((i + 1, product_url))  # Store rank and URL
-            except Exception as e:
-                print(f"Error extracting URL from element {i+1}: {e}")
+                elements = wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, selector)))
+                if elements:
+                    card_selector = selector
+                    print(f"Found {len(elements)} products using selector: {selector}")
+                    break
+            except TimeoutException:
                 continue
         
-        # Now process each product URL
-        results = []
-        for rank, product_url in product_urls:
-            try:
-                print(f"Processing product {rank}: {product_url}")
-                
-                # Visit the product page
-                driver.get(product_url)
-                time.sleep(2)  # Wait for page to load
-                
-                # Extract all product information from the product page
+        if not card_selector:
+            # If no specific product containers found, look for any links to products
+            product_links = wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a[href*='/products/']")))
+            if product_links:
+                print(f"Found {len(product_links)} product links")
+                # Get unique product URLs, in page order
+                hrefs = (link.get_attribute('href') for link in product_links)
+                product_urls = list(dict.fromkeys(href for href in hrefs if href))[:max_results]
+                return [(rank, {"product_url": url}) for rank, url in enumerate(product_urls, 1)]
+            else:
+                return []
+        
+    except TimeoutException:
+        print("Timeout waiting for product elements to load")
+        return []
+    
+    # Read every card's fields in one script call, before any navigation
+    cards = driver.execute_script(
+        _LISTING_EXTRACT_JS,
+        card_selector,
+        max_results,
+        _CARD_NAME_SELECTOR,
+        _CARD_PRICE_SELECTOR,
+        _CARD_RATING_SELECTOR,
+        _CARD_REVIEW_SELECTOR,
+    )
+    return list(enumerate(cards, 1))
+
+
+def _scrape_product(pool: DriverPool, rank: int, listing: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """Scrape one product page, borrowing a pooled driver only if it needs rendering.
+    
+    Fields the product page leaves empty are filled from the search listing.
+    """
+    product_url = listing["product_url"]
+    try:
+        print(f"Processing product {rank}: {product_url}")
+        product_info = _fetch_static(product_url)
+        if not (product_info and product_info["product_name"]):
+            with pool.acquire() as driver:
+                # Extract all product information from the rendered product page
                 product_info = get_product_details_selenium(product_url, driver)
-                if product_info:
-                    product_info["rank"] = rank
-                    results.append(product_info)
-                    print(f"Extracted product {rank}: {product_info.get('product_name', 'Unknown')[:50]}...")
-                
-            except Exception as e:
-                print(f"Error processing product {rank}: {e}")
-                continue
         
-        return results
+        if product_info:
+            for key, value in listing.items():
+                if value and not product_info.get(key):
+                    product_info[key] = value
+            product_info["rank"] = rank
+            print(f"Extracted product {rank}: {product_info.get('product_name', 'Unknown')[:50]}...")
+        return product_info
         
     except Exception as e:
-        print(f"Error in search_products_selenium: {str(e)}")
-        return [{"error": f"Search failed: {str(e)}"}]
-    
-    finally:
-        if driver:
-            driver.quit()
+        print(f"Error processing product {rank}: {e}")
+        return None
+
+
+def _scrape_products(pool: DriverPool, listings: List[Tuple[int, Dict[str, str]]]) -> List[Dict[str, Any]]:
+    """Scrape ranked listings in parallel, keeping rank order."""
+    if not listings:
+        return []
+    with ThreadPoolExecutor(max_workers=min(pool.size, len(listings))) as executor:
+        pages = executor.map(lambda item: _scrape_product(pool, *item), listings)
+        return [product_info for product_info in pages if product_info]
 
 
 def extract_product_info_from_element(element, driver) -> Optional[Dict[str, Any]]:
     """Extract product information from a product element.
     
+    The card's markup is fetched in one driver round-trip and parsed
+    locally, so no field costs a further WebDriver call. Rating, reviews
+    and location are only looked for when name, price or URL is missing.
+    
     Args:
         element: Selenium WebElement containing product information.
         driver: WebDriver instance.
@@ -194,6 +587,9 @@ def extract_product_info_from_element(element, driver) -> Optional[Dict[str, Any
         Dictionary containing product information or None if extraction fails.
     """
     try:
+        card = HTMLParser(element.get_attribute("outerHTML")).body
+        all_text = card.text(separator="\n")
+        
         product_info = {
             "product_name": "",
             "price": "",
@@ -211,136 +607,53 @@ def extract_product_info_from_element(element, driver) -> Optional[Dict[str, Any
         }
         
         # Extract product URL
-        try:
-            link = element.find_element(By.CSS_SELECTOR, "a[href*='/products/']")
-            product_url = link.get_attribute('href')
+        link = card.css_first("a[href*='/products/']")
+        if link:
+            product_url = link.attributes.get('href')
             if product_url:
-                if product_url.startswith('//'):
-                    product_url = 'https:' + product_url
-                elif product_url.startswith('/'):
-                    product_url = BASE_URL + product_url
-                product_info["product_url"] = product_url
-        except NoSuchElementException:
-            pass
+                product_info["product_url"] = urljoin(BASE_URL, product_url)
         
         # Extract product name - based on actual Daraz structure
-        name_selectors = [
-            "div.RfADt",  # Specific class found in testing
-            "a[href*='/products/']",  # Product link often contains the name
-            "div[class*='title']",
-            "div[class*='name']",
-            "div[class*='product-name']",
-            "h3", "h4", "h5",
-            "span[class*='title']",
-            "span[class*='name']",
-            "a[class*='title']"
-        ]
-        
-        for selector in name_selectors:
-            try:
-                name_elem = element.find_element(By.CSS_SELECTOR, selector)
-                name_text = name_elem.text.strip()
-                # Clean up the text - remove price and other info, keep only the product name
-                if name_text:
-                    # Split by newlines and take the first line (usually the product name)
-                    lines = name_text.split('\n')
-                    clean_name = lines[0].strip()
-                    if clean_name and len(clean_name) > 3 and not clean_name.startswith('Rs.'):
-                        product_info["product_name"] = clean_name
-                        break
-            except NoSuchElementException:
-                continue
+        for name_elem in card.css(_CARD_NAME_SELECTOR):
+            name_text = name_elem.text(separator="\n").strip()
+            # Clean up the text - remove price and other info, keep only the product name
+            if name_text:
+                # Split by newlines and take the first line (usually the product name)
+                lines = name_text.split('\n')
+                clean_name = lines[0].strip()
+                if clean_name and len(clean_name) > 3 and not clean_name.startswith('Rs.'):
+                    product_info["product_name"] = clean_name
+                    break
         
         # Extract price - look for "Rs." pattern in text
-        try:
-            # Get all text content and look for price pattern
-            all_text = element.text
-            import re
-            price_match = re.search(r'Rs\.\s*[\d,]+', all_text)
-            if price_match:
-                product_info["price"] = price_match.group()
-        except:
-            pass
+        price_match = _PRICE_RE.search(all_text)
+        if price_match:
+            product_info["price"] = price_match.group()
         
         # Also try specific selectors as fallback
-        price_selectors = [
-            "span[class*='price']",
-            "div[class*='price']",
-            "span[class*='currency']",
-            "div[class*='currency']",
-            "span[class*='amount']"
-        ]
-        
         if not product_info["price"]:  # Only try selectors if regex didn't find price
-            for selector in price_selectors:
-                try:
-                    price_elem = element.find_element(By.CSS_SELECTOR, selector)
-                    price_text = price_elem.text.strip()
-                    if price_text and any(char.isdigit() for char in price_text):
-                        product_info["price"] = price_text
-                        break
-                except NoSuchElementException:
-                    continue
+            product_info["price"] = _first_text(card.css(_CARD_PRICE_SELECTOR), needs_digit=True)
+        
+        # Name, price and URL are all a caller needs; skip the optional fields
+        if product_info["product_name"] and product_info["price"] and product_info["product_url"]:
+            return product_info
         
         # Image URL extraction removed for cleaner response
         
         # Extract rating
-        rating_selectors = [
-            "span[class*='rating']",
-            "div[class*='rating']",
-            "span[class*='score']",
-            "div[class*='score']"
-        ]
-        
-        for selector in rating_selectors:
-            try:
-                rating_elem = element.find_element(By.CSS_SELECTOR, selector)
-                rating_text = rating_elem.text.strip()
-                if rating_text and any(char.isdigit() for char in rating_text):
-                    product_info["rating"] = rating_text
-                    break
-            except NoSuchElementException:
-                continue
+        product_info["rating"] = _first_text(card.css(_CARD_RATING_SELECTOR), needs_digit=True)
         
         # Extract review count
-        review_selectors = [
-            "span[class*='review']",
-            "div[class*='review']",
-            "span[class*='comment']",
-            "div[class*='comment']"
-        ]
-        
-        for selector in review_selectors:
-            try:
-                review_elem = element.find_element(By.CSS_SELECTOR, selector)
-                review_text = review_elem.text.strip()
-                if review_text and any(char.isdigit() for char in review_text):
-                    product_info["review_count"] = review_text
+        product_info["review_count"] = _first_text(card.css(_CARD_REVIEW_SELECTOR), needs_digit=True)
+        
+        # Extract seller location - look for common location patterns in text
+        for pattern in _LOCATION_RES:
+            location_match = pattern.search(all_text)
+            if location_match:
+                location = location_match.group(1).strip()
+                if location and len(location) > 3:
+                    product_info["seller_location"] = location
                     break
-            except NoSuchElementException:
-                continue
-        
-        # Extract seller location - look for location patterns in text
-        try:
-            all_text = element.text
-            import re
-            # Look for common location patterns
-            location_patterns = [
-                r'([A-Za-z\s]+Province)',
-                r'([A-Za-z\s]+District)',
-                r'([A-Za-z\s]+City)',
-                r'([A-Za-z\s]+Nepal)'
-            ]
-            
-            for pattern in location_patterns:
-                location_match = re.search(pattern, all_text)
-                if location_match:
-                    location = location_match.group(1).strip()
-                    if location and len(location) > 3:
-                        product_info["seller_location"] = location
-                        break
-        except:
-            pass
         
         return product_info if product_info["product_name"] else None
         
@@ -363,117 +676,18 @@ def get_product_details_selenium(product_url: str, driver: webdriver.Chrome) ->
         print(f"Scraping product: {product_url}")
         driver.get(product_url)
         
-        # Wait for page to load
-        wait = WebDriverWait(driver, 10)
-        
-        product_info = {
-            "product_name": "",
-            "price": "",
-            "original_price": "",
-            "discount": "",
-            "rating": "",
-            "review_count": "",
-            "seller_name": "",
-            "seller_location": "",
-            "brand": "",
-            "availability": "",
-            "product_url": product_url,
-            "rank": 0,  # Will be set by caller
-            "scraped_at": time.strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        # Extract product name
-        name_selectors = [
-            "h1[class*='pdp-product-name']",
-            "h1[class*='product-name']",
-            "h1[class*='title']",
-            "h1",
-            "span[class*='pdp-product-name']",
-            "div[class*='product-name']"
-        ]
+        product_info = _empty_product_info(product_url)
         
-        for selector in name_selectors:
-            try:
-                name_elem = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                if name_elem:
-                    product_info["product_name"] = name_elem.text.strip()
-                    break
-            except TimeoutException:
-                continue
-        
-        # Extract price
-        price_selectors = [
-            "span[class*='pdp-price']",
-            "span[class*='current-price']",
-            "span[class*='price-current']",
-            "div[class*='price-current']",
-            "span[class*='currency']"
-        ]
-        
-        for selector in price_selectors:
-            try:
-                price_elem = driver.find_element(By.CSS_SELECTOR, selector)
-                if price_elem:
-                    product_info["price"] = price_elem.text.strip()
-                    break
-            except NoSuchElementException:
-                continue
-        
-        # Extract seller information using the specific selector you provided
+        # Continue as soon as the title or price renders; extraction stays best-effort on timeout
         try:
-            seller_elem = driver.find_element(By.CSS_SELECTOR, "div.seller-name__detail a.seller-name__detail-name")
-            if seller_elem:
-                product_info["seller_name"] = seller_elem.text.strip()
-        except NoSuchElementException:
-            # Fallback to other selectors if the specific one doesn't work
-            seller_selectors = [
-                "a[class*='seller']",
-                "div[class*='seller']",
-                "span[class*='seller']",
-                "a[href*='seller']"
-            ]
-            
-            for selector in seller_selectors:
-                try:
-                    seller_elem = driver.find_element(By.CSS_SELECTOR, selector)
-                    if seller_elem:
-                        product_info["seller_name"] = seller_elem.text.strip()
-                        break
-                except NoSuchElementException:
-                    continue
-        
-        # Extract brand
-        brand_selectors = [
-            "span[class*='brand']",
-            "div[class*='brand']",
-            "a[class*='brand']"
-        ]
-        
-        for selector in brand_selectors:
-            try:
-                brand_elem = driver.find_element(By.CSS_SELECTOR, selector)
-                if brand_elem:
-                    product_info["brand"] = brand_elem.text.strip()
-                    break
-            except NoSuchElementException:
-                continue
-        
-        # Extract availability
-        availability_selectors = [
-            "span[class*='stock']",
-            "div[class*='stock']",
-            "span[class*='availability']",
-            "div[class*='availability']"
-        ]
+            WebDriverWait(driver, PDP_WAIT_TIMEOUT).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, _PDP_READY_SELECTOR))
+            )
+        except TimeoutException:
+            pass
         
-        for selector in availability_selectors:
-            try:
-                avail_elem = driver.find_element(By.CSS_SELECTOR, selector)
-                if avail_elem:
-                    product_info["availability"] = avail_elem.text.strip()
-                    break
-            except NoSuchElementException:
-                continue
+        # Extract name, price, seller, brand and availability in one script call
+        product_info.update(driver.execute_script(_PDP_EXTRACT_JS, _PDP_FIELDS))
             
         return product_info
         
@@ -482,21 +696,62 @@ def get_product_details_selenium(product_url: str, driver: webdriver.Chrome) ->
         return None
 
 
-def get_products_from_urls(product_urls: List[str], driver: webdriver.Chrome) -> List[Dict[str, Any]]:
+def _fetch_static(product_url: str) -> Optional[Dict[str, Any]]:
+    """Get product information from the server-rendered HTML, without a browser.
+    
+    Args:
+        product_url: Product URL to fetch.
+        
+    Returns:
+        Dictionary containing product information, or None if the request
+        fails. Fields missing from the initial HTML are left empty.
+    """
+    try:
+        response = _SESSION.get(product_url, timeout=STATIC_TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        print(f"Static fetch failed for {product_url}: {e}")
+        return None
+    
+    tree = HTMLParser(response.content)
+    product_info = _empty_product_info(product_url)
+    for field, selectors in _PDP_FIELDS.items():
+        # Same rule as _PDP_EXTRACT_JS: first match of each selector, first non-empty wins
+        product_info[field] = _first_text(filter(None, map(tree.css_first, selectors)))
+    return product_info
+
+
+def _get_product_details(product_url: str, driver: webdriver.Chrome) -> Optional[Dict[str, Any]]:
+    """Get product information statically, rendering the page only if that fails."""
+    product_info = _fetch_static(product_url)
+    if product_info and product_info["product_name"]:
+        return product_info
+    return get_product_details_selenium(product_url, driver)
+
+
+def get_products_from_urls(
+    product_urls: List[str], driver: Optional[webdriver.Chrome] = None, *, headless: bool = True
+) -> List[Dict[str, Any]]:
     """Get detailed product information from a list of product URLs.
     
     Args:
         product_urls: List of product URLs to scrape.
-        driver: WebDriver instance.
+        driver: WebDriver instance to scrape with serially. If omitted, a
+            pool of drivers scrapes the pages in parallel.
+        headless: Whether pooled browsers run in headless mode.
         
     Returns:
         List of dictionaries containing detailed product information.
     """
+    if driver is None:
+        listings = [(rank, {"product_url": url}) for rank, url in enumerate(product_urls, 1)]
+        return _scrape_products(_get_pool(headless), listings)
+    
     results = []
     
     for i, url in enumerate(product_urls):
         try:
-            product_info = get_product_details_selenium(url, driver)
+            product_info = _get_product_details(url, driver)
             if product_info:
                 product_info["rank"] = i + 1
                 results.append(product_info)
@@ -506,6 +761,3 @@ def get_products_from_urls(product_urls: List[str], driver: webdriver.Chrome) ->
     
     return results
 
-
-# Import requests for URL encoding
-import requests
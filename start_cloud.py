@@ -10,8 +10,8 @@ Optimized for deployment on Render, Heroku, and other cloud platforms.
 import os
 import sys
 import logging
-from waitress import serve
 from app_cloud import app
+from start_production import run_gunicorn
 
 def setup_logging():
     """Setup cloud logging configuration"""
@@ -33,21 +33,31 @@ def main():
     # Get configuration from environment
     host = os.environ.get('HOST', '0.0.0.0')
     port = int(os.environ.get('PORT', '5000'))
-    threads = int(os.environ.get('THREADS', '2'))  # Reduced for cloud
+    workers = int(os.environ.get('WORKERS', '2'))  # Reduced for cloud
+    threads = int(os.environ.get('THREADS', '8'))
+    
+    # Threaded workers overlap requests that sit blocked on scraping IO. Not
+    # gevent: scraper_cloud holds real threading locks across Selenium calls
+    options = {
+        'bind': f"{host}:{port}",
+        'workers': workers,
+        'worker_class': 'gthread',
+        'threads': threads,
+        'timeout': int(os.environ.get('TIMEOUT', '120')),  # Selenium scrapes run long
+        'accesslog': '-',
+        'errorlog': '-',
+        'proc_name': 'daraz-scraper-api-cloud',
+    }
+    if os.environ.get('HTTPS', 'false').lower() == 'true':
+        # Take the scheme from the platform proxy's X-Forwarded-Proto header
+        options['forwarded_allow_ips'] = '*'
     
     logger.info(f"Starting Daraz Scraper API on {host}:{port}")
-    logger.info(f"Using {threads} threads")
+    logger.info(f"Using {workers} workers with {threads} threads each")
     logger.info("Server ready for cloud deployment!")
     
     # Start the server
-    serve(
-        app,
-        host=host,
-        port=port,
-        threads=threads,
-        url_scheme='https' if os.environ.get('HTTPS', 'false').lower() == 'true' else 'http',
-        ident='Daraz-Scraper-API-Cloud'
-    )
+    run_gunicorn(app, options)
 
 if __name__ == '__main__':
     main()
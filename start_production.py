@@ -54,6 +54,45 @@ def setup_environment():
     os.environ.setdefault('BATCH_SIZE', '10')
     os.environ.setdefault('MAX_RESULTS_PER_QUERY', '100')
 
+def run_gunicorn(app, options):
+    """Serve a WSGI app with Gunicorn using the given settings.
+    
+    Raises ImportError if Gunicorn is not installed.
+    """
+    from gunicorn.app.base import BaseApplication
+    
+    class StandaloneApplication(BaseApplication):
+        def __init__(self, app, options=None):
+            self.options = options or {}
+            self.application = app
+            super().__init__()
+        
+        def load_config(self):
+            config = {key: value for key, value in self.options.items()
+                     if key in self.cfg.settings and value is not None}
+            for key, value in config.items():
+                self.cfg.set(key.lower(), value)
+        
+        def load(self):
+            return self.application
+    
+    StandaloneApplication(app, options).run()
+
+def on_starting(server):
+    """Gunicorn hook: warm the Selenium scraper in the master before forking.
+    
+    Off unless SELENIUM_WARMUP=true: app.py scrapes with requests and only
+    falls back to Selenium, so most starts never need a browser.
+    """
+    if os.environ.get('SELENIUM_WARMUP', 'false').lower() != 'true':
+        return
+    try:
+        from scraper_selenium import _warmup
+    except ImportError:
+        logging.info("Selenium not available, skipping warmup")
+        return
+    _warmup()
+
 def signal_handler(signum, frame):
     """Handle shutdown signals gracefully"""
     logging.info(f"Received signal {signum}, shutting down gracefully...")
@@ -74,24 +113,8 @@ def main():
     
     # Import and configure Gunicorn
     try:
-        from gunicorn.app.base import BaseApplication
         from app import app
         
-        class StandaloneApplication(BaseApplication):
-            def __init__(self, app, options=None):
-                self.options = options or {}
-                self.application = app
-                super().__init__()
-            
-            def load_config(self):
-                config = {key: value for key, value in self.options.items()
-                         if key in self.cfg.settings and value is not None}
-                for key, value in config.items():
-                    self.cfg.set(key.lower(), value)
-            
-            def load(self):
-                return self.application
-        
         # Gunicorn configuration
         options = {
             'bind': f"0.0.0.0:{os.environ.get('PORT', '5000')}",
@@ -103,6 +126,7 @@ def main():
             'timeout': int(os.environ.get('GUNICORN_TIMEOUT', '30')),
             'keepalive': int(os.environ.get('GUNICORN_KEEPALIVE', '2')),
             'preload_app': True,
+            'on_starting': on_starting,
             'accesslog': '-',
             'errorlog': '-',
             'loglevel': os.environ.get('GUNICORN_LOG_LEVEL', 'info'),
@@ -112,7 +136,7 @@ def main():
         logger.info(f"Starting server with {options['workers']} workers on {options['bind']}")
         
         # Start the application
-        StandaloneApplication(app, options).run()
+        run_gunicorn(app, options)
         
     except ImportError as e:
         logger.error(f"Failed to import required modules: {e}")